@@ -1,30 +1,51 @@
+import itertools as it
+import os
+from typing import Iterable, Iterator
+
 import numpy as np
-from numba import jit
-import time
+from numba import jit, prange
+
+from aoc.benchmark import compiles, timer
+from aoc.stream import read_lines
 
 
 ###############################################################################
 
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
+def read_file(filename: str) -> np.ndarray:
+    """Reads the depth measurements from the file.
+
+    Args:
+        filename: name of the file with the data.
+
+    Returns:
+        : depth measurements.
+
+    Requires:
+        filename must be the name of a valid file.
+    """
+
+    return np.loadtxt(filename, dtype="int")
+
+
+def read_stream(filename: str) -> Iterator[str]:
+    """Reads the depth measurements from the file one at a time.
 
     Args:
-        function: function to time.
+        filename: name of the file with the data, or "-" for the standard
+            input.
+
+    Returns:
+        : depth measurements, as strings.
     """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
+
+    return read_lines(filename)
 
 
 ###############################################################################
 # part 1
 
 @timer
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def count_increases(data: np.ndarray) -> int:
     """Counts the number of times one input increases to the next.
 
@@ -47,11 +68,11 @@ def part1(test_data: np.ndarray, data: np.ndarray):
     """Solves the first part of the problem for day 1.
 
     Args:
-        test_data: small dataset to compile the function
+        test_data: small dataset provided to test the algorithm
         data: dataset used to solve part 1 of the problem
     """
 
-    count_increases(test_data) # compilation step on a smaller dataset
+    count_increases(test_data)
     count_increases(data)
 
 
@@ -59,7 +80,7 @@ def part1(test_data: np.ndarray, data: np.ndarray):
 # part 2
 
 @timer
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def count_3_increases(data: np.ndarray) -> int:
     """Counts the number of times the sum of three inputs increased from the
     sum of the previous three inputs. There is an overlap of 2 inputs between 
@@ -88,19 +109,362 @@ def part2(test_data: np.ndarray, data: np.ndarray):
     """Solves the second part of the problem for day 1.
 
     Args:
-        test_data: small dataset to compile the function
-        data: dataset used to solve part 1 of the problem
+        test_data: small dataset provided to test the algorithm
+        data: dataset used to solve part 2 of the problem
     """
 
-    count_3_increases(test_data) # compilation step on a smaller dataset
+    count_3_increases(test_data)
     count_3_increases(data)
 
 
+###############################################################################
+# parallel
+
+@timer
+@jit(nopython=True, parallel=True, cache=True)
+def count_increases_parallel(data: np.ndarray) -> int:
+    """Parallel version of `count_increases`. The inputs are split among the
+    available threads and each thread counts the increases of its shard, the
+    first input of a shard being compared with the last one of the previous
+    shard, so the result is the same as the one of the serial version.
+
+    Args:
+        data: array of inputs
+
+    Returns:
+        Number of times one input increases to the next
+    """
+
+    result = 0
+    for i in prange(1, data.shape[0]):
+        if data[i] > data[i - 1]:
+            result += 1
+    return result
+
+
+@timer
+@jit(nopython=True, parallel=True, cache=True)
+def count_3_increases_parallel(data: np.ndarray) -> int:
+    """Parallel version of `count_3_increases`. Consecutive sums of three
+    inputs share two of them, so a sum increases exactly when the input that
+    enters it is greater than the one that leaves it, three positions before.
+    Each comparison is independent of the others, so they are split among the
+    available threads like in `count_increases_parallel`.
+
+    Args:
+        data: array of inputs
+
+    Returns:
+        Number of times the sum of three inputs increased
+    """
+
+    result = 0
+    for i in prange(3, data.shape[0]):
+        if data[i] > data[i - 3]:
+            result += 1
+    return result
+
+
+###############################################################################
+# arbitrary windows
+
+@jit(nopython=True, parallel=True, cache=True)
+def count_many_lag_increases(data: np.ndarray, lags: np.ndarray,
+                             block: int=1 << 14) -> np.ndarray:
+    """Counts, for many lags at once, the number of times an input is greater
+    than the input `lag` positions before it. The inputs are read from memory
+    once, in blocks split among the available threads: every lag is counted
+    over a block while it is still in the cache, together with the max(lags)
+    inputs before it.
+
+    Args:
+        data: array of inputs
+        lags: distances between the compared inputs.
+        block (optional): number of inputs handled by a thread at a time.
+            Defaults to 16384.
+
+    Returns:
+        : number of increases for each lag, in the same order as `lags`.
+    """
+
+    n_blocks = (data.shape[0] + block - 1) // block
+    counts = np.zeros((n_blocks, lags.shape[0]), dtype=np.int64)
+    for b in prange(n_blocks):
+        end = min(data.shape[0], (b + 1) * block)
+        for j in range(lags.shape[0]):
+            start = max(b * block, lags[j])
+            counts[b, j] = count_lag_increases(data[start - lags[j]:end],
+                                               lags[j])
+
+    result = np.zeros(lags.shape[0], dtype=np.int64)
+    for b in range(n_blocks):
+        result += counts[b]
+    return result
+
+
+@timer
+@compiles(lambda data, k: [(count_lag_increases, (data, k))])
+def count_window_increases(data: np.ndarray, k: int) -> int:
+    """Counts the number of times the sum of `k` inputs increased from the sum
+    of the previous `k` inputs. The two sums share k-1 inputs, so the sum
+    increases exactly when data[i+k] > data[i], and no sum is ever computed.
+
+    Args:
+        data: array of inputs
+        k: number of inputs in each sum.
+
+    Returns:
+        : number of times the sum of `k` inputs increased.
+
+    Raises:
+        ValueError: k is smaller than 1.
+    """
+
+    if k < 1:
+        raise ValueError(f"windows must have at least one input, got {k}")
+    return count_lag_increases(data, k)
+
+
+@timer
+@compiles(lambda data, windows: [(count_many_lag_increases,
+                                  (data, np.asarray(windows, dtype=np.int64)))])
+def count_windows_increases(data: np.ndarray, windows) -> np.ndarray:
+    """Batch version of `count_window_increases`: counts the increases of the
+    sums of every window length in `windows` with a single pass over the data.
+
+    Args:
+        data: array of inputs
+        windows: lengths of the windows, e.g. range(1, 1001).
+
+    Returns:
+        : number of times the sum increased for each window length, in the
+            same order as `windows`.
+
+    Raises:
+        ValueError: a window is smaller than 1.
+    """
+
+    windows = np.asarray(windows, dtype=np.int64)
+    if windows.size and windows.min() < 1:
+        raise ValueError("windows must have at least one input")
+    return count_many_lag_increases(data, windows)
+
+
+###############################################################################
+# streaming
+
+def stream_increases(data: Iterable[str], window: int,
+                        batch: int=1 << 16) -> int:
+    """Counts the number of times the sum of `window` inputs increased from the
+    sum of the previous `window` inputs, reading the inputs in batches.
+
+        Consecutive sums share all but one input, so the sum increases exactly
+    when the input entering the window is greater than the one leaving it. Only
+    the last `window` inputs of each batch are kept for the next one.
+
+    Args:
+        data: inputs, as strings.
+        window: number of inputs in each sum.
+        batch (optional): number of inputs converted at a time. Defaults to
+            65536.
+
+    Returns:
+        result: number of times the sum increased.
+    """
+
+    lines = iter(data)
+    tail = np.empty(0, dtype=np.int64)
+    result = 0
+
+    while True:
+        chunk = np.fromiter(map(int, it.islice(lines, batch)), dtype=np.int64)
+        if chunk.size == 0:
+            return result
+
+        values = np.concatenate((tail, chunk))
+        result += int(np.count_nonzero(values[window:] > values[:-window]))
+        tail = values[-window:]
+
+
+@timer
+def count_increases_stream(data: Iterable[str]) -> int:
+    """Streaming version of `count_increases`, for inputs that don't fit in
+    memory.
+
+    Args:
+        data: inputs, as strings.
+
+    Returns:
+        Number of times one input increases to the next
+    """
+
+    return stream_increases(data, 1)
+
+
+@timer
+def count_3_increases_stream(data: Iterable[str]) -> int:
+    """Streaming version of `count_3_increases`, for inputs that don't fit in
+    memory.
+
+    Args:
+        data: inputs, as strings.
+
+    Returns:
+        Number of times the sum of three inputs increased
+    """
+
+    return stream_increases(data, 3)
+
+
+###############################################################################
+# out of core
+
+def convert_to_binary(filename: str, binary_file: str=None,
+                        batch: int=1 << 20) -> str:
+    """Converts a file of depth measurements (one per line) to a binary file
+    of int32 values, reading it in batches, so that the conversion also runs in
+    constant memory. The conversion is skipped if the binary file is newer than
+    the text file.
+
+    Args:
+        filename: name of the file with the data.
+        binary_file (optional): name of the binary file. Defaults to the name
+            of the text file followed by ".int32".
+        batch (optional): number of measurements converted at a time. Defaults
+            to 1048576.
+
+    Returns:
+        binary_file: name of the binary file.
+    """
+
+    binary_file = binary_file or filename + ".int32"
+    if (os.path.exists(binary_file)
+            and os.path.getmtime(binary_file) >= os.path.getmtime(filename)):
+        return binary_file
+
+    lines = read_lines(filename)
+    temporary = f"{binary_file}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as output:
+        while True:
+            chunk = np.fromiter(map(int, it.islice(lines, batch)),
+                                dtype=np.int32)
+            if chunk.size == 0:
+                break
+            chunk.tofile(output)
+    os.replace(temporary, binary_file)
+
+    return binary_file
+
+
+def read_binary(filename: str) -> str:
+    """Converts the depth measurements to a binary file, if they weren't
+    converted yet, for the out of core functions.
+
+    Args:
+        filename: name of the file with the data.
+
+    Returns:
+        : name of the binary file.
+    """
+
+    return convert_to_binary(filename)
+
+
+@jit(nopython=True, cache=True)
+def count_lag_increases(data: np.ndarray, lag: int) -> int:
+    """Counts the number of times an input is greater than the input `lag`
+    positions before it, which is the number of times the sum of `lag` inputs
+    increases from the previous sum.
+
+    Args:
+        data: array of inputs
+        lag: distance between the compared inputs.
+
+    Returns:
+        result: number of times an input is greater than the one `lag`
+            positions before.
+    """
+
+    result = 0
+    for i in range(lag, data.shape[0]):
+        result += data[i] > data[i - lag]
+    return result
+
+
+def scan_binary(binary_file: str, lag: int, chunk: int=1 << 24) -> int:
+    """Counts the increases of the sums of `lag` inputs over a binary file of
+    int32 inputs, memory-mapped and scanned in chunks of fixed size. The only
+    state carried from one chunk to the next are the last `lag` inputs, so each
+    chunk is scanned together with the `lag` inputs before it.
+
+    Args:
+        binary_file: name of the binary file.
+        lag: number of inputs in each sum.
+        chunk (optional): number of inputs scanned at a time. Defaults to
+            16777216 (64 MiB).
+
+    Returns:
+        result: number of times the sum increased.
+    """
+
+    if os.path.getsize(binary_file) == 0:
+        return 0
+
+    data = np.memmap(binary_file, dtype=np.int32, mode="r")
+    result = 0
+    for start in range(0, data.shape[0], chunk):
+        block = np.asarray(data[max(start - lag, 0):start + chunk])
+        result += count_lag_increases(block, lag)
+    return result
+
+
+def scan_kernels(binary_file: str) -> list:
+    """Numba functions called by `scan_binary`, with inputs of the types of the
+    blocks of a binary file: read-only arrays of int32.
+    """
+
+    return [(count_lag_increases, (np.frombuffer(b"", dtype=np.int32), 1))]
+
+
+@timer
+@compiles(scan_kernels)
+def count_increases_memmap(binary_file: str) -> int:
+    """Out of core version of `count_increases`, for inputs that don't fit in
+    memory.
+
+    Args:
+        binary_file: name of the binary file with the inputs, see
+            `convert_to_binary`.
+
+    Returns:
+        Number of times one input increases to the next
+    """
+
+    return scan_binary(binary_file, 1)
+
+
+@timer
+@compiles(scan_kernels)
+def count_3_increases_memmap(binary_file: str) -> int:
+    """Out of core version of `count_3_increases`, for inputs that don't fit in
+    memory.
+
+    Args:
+        binary_file: name of the binary file with the inputs, see
+            `convert_to_binary`.
+
+    Returns:
+        Number of times the sum of three inputs increased
+    """
+
+    return scan_binary(binary_file, 3)
+
+
 ############################################################################### 
 
 if __name__ == '__main__':
-    test_data = np.loadtxt("test_input.txt", dtype="int")
-    data = np.loadtxt("input.txt", dtype="int")
+    test_data = read_file("test_input.txt")
+    data = read_file("input.txt")
     
     print("Part 1 " + "-"*40)
     part1(test_data, data)
@@ -1,24 +1,11 @@
-import time
 import collections as cls
+from typing import Iterator
 
+from aoc.benchmark import timer
+from aoc.stream import read_lines
 
-###############################################################################
-
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
-
-    Args:
-        function: function to time.
-    """
-    
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
 
+###############################################################################
 
 def read_file(filename: str) -> list:
     """Reads the lines from the file.
@@ -39,6 +26,22 @@ def read_file(filename: str) -> list:
     return data
 
 
+def read_stream(filename: str) -> Iterator[str]:
+    """Reads the lines from the file one at a time. Both parts go through the
+    lines once, but part 2 still keeps the score of each incomplete line to
+    find their median.
+
+    Args:
+        filename: name of the file with the data, or "-" for the standard
+            input.
+
+    Returns:
+        : lines of braces.
+    """
+
+    return read_lines(filename)
+
+
 ###############################################################################
 # part 1
 
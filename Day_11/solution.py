@@ -1,4 +1,3 @@
-import time
 import copy
 
 import numpy as np
@@ -6,24 +5,10 @@ import collections as cls
 
 from typing import Generator
 
+from aoc.benchmark import timer
 
-###############################################################################
-
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
-
-    Args:
-        function: function to time.
-    """
-    
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
 
+###############################################################################
 
 def read_file(filename: str) -> np.ndarray:
     """Reads the lines from the file.
@@ -1,35 +1,187 @@
-from typing import List, Tuple
+import concurrent.futures as cf
+import functools as ft
+import os
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
 
 import numpy as np
-import time
+
+from aoc.benchmark import timer
+from aoc.stream import read_lines
 
 
 ###############################################################################
 
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
+FORWARD, DOWN, UP = 0, 1, -1
+UNKNOWN = 2
+
+# code of each direction, indexed by the last letter of its name
+DIRECTION_CODES = np.full(256, UNKNOWN, dtype=np.int8)
+DIRECTION_CODES[[ord("d"), ord("n"), ord("p")]] = [FORWARD, DOWN, UP]
+
+
+def raise_wrong_line(raw: np.ndarray, position: int):
+    """Reports a line of a course that isn't an instruction.
+
+    Args:
+        raw: bytes of the course, as an uint8 array.
+        position: position of a byte of the line in the course.
+
+    Raises:
+        ValueError: always, with the number of the line.
+    """
+
+    line = np.count_nonzero(raw[:position] == ord("\n")) + 1
+    raise ValueError(f"line {line} of the course doesn't have a direction and "
+                     f"a value")
+
+
+def parse_course(raw: np.ndarray) -> tuple:
+    """Encodes the instructions of a course as direction codes and values, with
+    numpy operations over the bytes of the course: the words of the course are
+    the runs of bytes between blanks (spaces, tabs, line breaks, ...), every
+    line has a direction and a value, the last letter of the direction tells
+    which one it is ("forward", "down" and "up" end in different letters) and
+    the digits of the value are added up by their powers of 10.
+
+    Args:
+        raw: bytes of the course, as an uint8 array.
+
+    Returns:
+        directions: int8 code of each direction, FORWARD (0), DOWN (1) or UP
+            (-1), so that the change of depth (or aim) is direction * value.
+        values: int64 value of each instruction.
+
+    Raises:
+        ValueError: if a line that isn't blank doesn't have exactly two words,
+            a direction and a value, or if the value isn't a number.
+    """
+
+    blank = np.concatenate(([True], raw <= ord(" "), [True]))
+    edges = np.diff(blank.view(np.int8))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    if starts.size == 0:
+        return np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64)
+
+    # each line must have exactly two words, so there must be a line break
+    # before every even word and only there. The blanks between two words are
+    # usually a single byte, the longer ones are looked up among all the line
+    # breaks
+    breaks = np.empty(starts.size + starts.size % 2, dtype=bool)
+    breaks[0] = True
+    breaks[1:starts.size] = raw[ends[:-1]] == ord("\n")
+    breaks[starts.size:] = True
+    longer = np.flatnonzero(starts[1:] - ends[:-1] > 1)
+    if longer.size > 0:
+        newlines = np.append(np.flatnonzero(raw == ord("\n")), raw.size)
+        following = newlines[np.searchsorted(newlines, ends[longer])]
+        breaks[longer + 1] = following < starts[longer + 1]
+    wrong = np.flatnonzero(~breaks[0::2] | breaks[1::2])
+    if wrong.size > 0:
+        raise_wrong_line(raw, starts[2 * wrong[0]])
+
+    # the values must be all the digits of the course, the i-th value going
+    # from the first[i]-th digit to the last[i]-th
+    directions = DIRECTION_CODES[raw[ends[0::2] - 1]]
+    wrong = np.flatnonzero(directions == UNKNOWN)
+    if wrong.size > 0:
+        raise_wrong_line(raw, starts[2 * wrong[0]])
+
+    lines, starts, ends = starts[0::2], starts[1::2], ends[1::2]
+    n_digits = ends - starts
+    first = np.cumsum(n_digits) - n_digits
+    last = first + n_digits - 1
+    digits = np.flatnonzero(raw - np.uint8(ord("0")) <= 9)
+    if digits.size == 0:
+        raise_wrong_line(raw, lines[0])
+    wrong = np.flatnonzero((last >= digits.size)
+                           | (digits.take(first, mode='clip') != starts)
+                           | (digits.take(last, mode='clip') != ends - 1))
+    if wrong.size > 0 or digits.size != last[-1] + 1:
+        raise_wrong_line(raw, lines[wrong[0] if wrong.size > 0 else -1])
+
+    powers = np.repeat(ends - 1, n_digits) - digits
+    values = np.add.reduceat((raw[digits] - ord("0")).astype(np.int64)
+                             * 10 ** powers, first)
+
+    return directions, values
+
+
+def read_file(filename: str) -> tuple:
+    """Reads the planned course from the file, encoding each instruction as a
+    direction code and a value.
 
     Args:
-        function: function to time.
+        filename: name of the file with the data.
+
+    Returns:
+        : direction codes and values of the instructions, see `parse_course`.
+
+    Requires:
+        filename must be the name of a valid file.
+
+    Raises:
+        ValueError: if a line doesn't have a direction and a value.
     """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
+
+    return parse_course(np.fromfile(filename, dtype=np.uint8))
+
+
+def read_path(filename: str) -> str:
+    """Finds the absolute path of the file, for the parallel functions, which
+    read the file in the worker processes.
+    """
+
+    return os.path.abspath(filename)
+
+
+def read_stream(filename: str) -> Iterator[list]:
+    """Reads the planned course from the file one instruction at a time, so
+    that `calculate_coor_stream` and `calculate_coor_w_aim_stream` can follow
+    courses that don't fit in memory.
+
+    Args:
+        filename: name of the file with the data, or "-" for the standard
+            input.
+
+    Returns:
+        : instructions (direction and value) of the course.
+    """
+
+    return (line.split() for line in read_lines(filename))
 
 
 ###############################################################################
 # part 1
 
 @timer
-def calculate_coor(data: np.ndarray) -> int:
+def calculate_coor(data: tuple) -> int:
     """Given a set of instructions with values associated, it increases or
     decreases the values of the horizontal position and the depth in accordance
     to the problem. After obtaining the final values of horizontal position and
     depth, it calculates the product of the two.
+        The horizontal position is the sum of the values of the forward
+    instructions and the depth is the sum of direction * value.
+
+    Args:
+        data: direction codes and values of the instructions, as returned by
+            `read_file`.
+
+    Returns:
+        int: result of the multiplication of the final horizontal position with
+            the final value.
+    """
+
+    directions, values = data
+    hor_pos = values[directions == FORWARD].sum()
+    depth = (directions * values).sum()
+    return int(hor_pos) * int(depth)
+
+
+@timer
+def calculate_coor_stream(data: Iterable) -> int:
+    """Streaming version of `calculate_coor`, that follows the instructions one
+    at a time.
 
     Args:
         data: set of instructions with associated values
@@ -51,7 +203,7 @@ def calculate_coor(data: np.ndarray) -> int:
     return hor_pos * depth
 
 
-def part1(test_data: np.ndarray, data: np.ndarray):
+def part1(test_data: tuple, data: tuple):
     """Solves the first part of the problem for day 2.
 
     Args:
@@ -66,12 +218,77 @@ def part1(test_data: np.ndarray, data: np.ndarray):
 ###############################################################################
 
 
+def summarize_course(directions: np.ndarray, values: np.ndarray) -> tuple:
+    """Follows a course from the surface with no aim, and summarizes it by the
+    final horizontal position, depth and aim.
+
+        Starting the course at depth d and aim a instead moves the submarine to
+    depth d + D + a*H and aim a + A, where (H, D, A) is the summary. So the
+    summaries of consecutive parts of a course can be combined, see
+    `combine_summaries`, and the course can be split into parts followed
+    independently of each other.
+
+    Args:
+        directions: direction codes of the instructions.
+        values: values of the instructions.
+
+    Returns:
+        : final horizontal position, depth and aim.
+    """
+
+    changes = directions * values
+    aim = np.cumsum(changes)
+    forward = directions == FORWARD
+    return (int(values[forward].sum()),
+            int((values[forward] * aim[forward]).sum()),
+            int(changes.sum()))
+
+
+def combine_summaries(first: tuple, second: tuple) -> tuple:
+    """Combines the summaries of two consecutive parts of a course into the
+    summary of the whole. The combination is associative, so any grouping of
+    the parts gives the same summary.
+
+    Args:
+        first: horizontal position, depth and aim of the first part.
+        second: horizontal position, depth and aim of the second part.
+
+    Returns:
+        : horizontal position, depth and aim of both parts.
+    """
+
+    hor_1, depth_1, aim_1 = first
+    hor_2, depth_2, aim_2 = second
+    return hor_1 + hor_2, depth_1 + depth_2 + aim_1 * hor_2, aim_1 + aim_2
+
+
 @timer
-def calculate_coor_w_aim(data: np.ndarray) -> int:
+def calculate_coor_w_aim(data: tuple) -> int:
     """Given a set of instructions with values associated, it increases or
     decreases the values of the horizontal position, aim and the depth in 
     accordance to the problem. After obtaining the final values of horizontal 
     position and depth, it calculates the product of the two.
+        The aim at each instruction is the cumulative sum of direction * value,
+    and each forward instruction increases the depth by its value times that
+    aim, see `summarize_course`.
+
+    Args:
+        data: direction codes and values of the instructions, as returned by
+            `read_file`.
+
+    Returns:
+        int: result of the multiplication of the final horizontal position with
+            the final value.
+    """
+
+    hor_pos, depth, _ = summarize_course(*data)
+    return hor_pos * depth
+
+
+@timer
+def calculate_coor_w_aim_stream(data: Iterable) -> int:
+    """Streaming version of `calculate_coor_w_aim`, that follows the
+    instructions one at a time.
 
     Args:
         data: set of instructions with associated values
@@ -95,7 +312,7 @@ def calculate_coor_w_aim(data: np.ndarray) -> int:
     return hor_pos * depth
 
 
-def part2(test_data: np.ndarray, data: np.ndarray):
+def part2(test_data: tuple, data: tuple):
     """Solves the second part of the problem for day 2.
 
     Args:
@@ -107,11 +324,226 @@ def part2(test_data: np.ndarray, data: np.ndarray):
 
 
 
+###############################################################################
+# parallel
+
+def split_file(filename: str, n_segments: int) -> list:
+    """Splits a file in segments of about the same size that end at the end of
+    a line.
+
+    Args:
+        filename: name of the file.
+        n_segments: number of segments.
+
+    Returns:
+        : offsets of the start and end of each non-empty segment.
+    """
+
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as datafile:
+        for i in range(1, n_segments):
+            datafile.seek(max(size * i // n_segments, bounds[-1]))
+            datafile.readline()
+            bounds.append(min(datafile.tell(), size))
+    bounds.append(size)
+
+    return [(start, end) for start, end in zip(bounds, bounds[1:])
+            if end > start]
+
+
+def summarize_segment(filename: str, segment: tuple) -> tuple:
+    """Reads and summarizes one segment of a course, see `summarize_course`.
+
+    Args:
+        filename: name of the file with the course.
+        segment: offsets of the start and end of the segment.
+
+    Returns:
+        : horizontal position, depth and aim of the segment.
+    """
+
+    start, end = segment
+    raw = np.fromfile(filename, dtype=np.uint8, count=end - start,
+                      offset=start)
+    return summarize_course(*parse_course(raw))
+
+
+def summarize_file(filename: str, workers: int=None) -> tuple:
+    """Summarizes a course by splitting the file in one segment per worker
+    process, each of which reads, parses and summarizes its own segment, and
+    combining the summaries of the segments in order.
+
+    Args:
+        filename: name of the file with the course.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        : horizontal position, depth and aim of the course.
+    """
+
+    workers = workers or os.cpu_count()
+    segments = split_file(filename, workers)
+    with cf.ProcessPoolExecutor(max_workers=workers) as executor:
+        summaries = executor.map(ft.partial(summarize_segment, filename),
+                                 segments)
+        return ft.reduce(combine_summaries, summaries, (0, 0, 0))
+
+
+@timer
+def calculate_coor_parallel(filename: str, workers: int=None) -> int:
+    """Parallel version of `calculate_coor`: without aim, the depth is the aim
+    of the summary of the course.
+
+    Args:
+        filename: name of the file with the course.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        int: result of the multiplication of the final horizontal position with
+            the final value.
+    """
+
+    hor_pos, _, depth = summarize_file(filename, workers)
+    return hor_pos * depth
+
+
+@timer
+def calculate_coor_w_aim_parallel(filename: str, workers: int=None) -> int:
+    """Parallel version of `calculate_coor_w_aim`.
+
+    Args:
+        filename: name of the file with the course.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        int: result of the multiplication of the final horizontal position with
+            the final value.
+    """
+
+    hor_pos, depth, _ = summarize_file(filename, workers)
+    return hor_pos * depth
+
+
+###############################################################################
+# trajectory
+
+class Trajectory(NamedTuple):
+    """Position of the submarine after each prefix of a course, with the aim
+    of part 2: element i of each array is the value after the first i
+    instructions, so element 0 is the surface. (Without aim, as in part 1, the
+    depth is the aim.) `max_depth` is a segment tree of the depths, with twice
+    as many elements as positions: the depth after i instructions is at
+    element (number of positions + i), and every other element k > 0 is the
+    maximum of elements 2k and 2k + 1. Element 0 isn't part of the tree, it
+    is the smallest int64, below any depth.
+    """
+
+    hor_pos: np.ndarray
+    depth: np.ndarray
+    aim: np.ndarray
+    max_depth: np.ndarray
+
+
+def build_trajectory(data: tuple) -> Trajectory:
+    """Builds the trajectory of a course with cumulative sums, and the segment
+    tree of its depths with one vectorized maximum per level of the tree, using
+    O(n) memory: the tree takes twice the memory of the depths.
+
+    Args:
+        data: direction codes and values of the instructions, as returned by
+            `read_file`.
+
+    Returns:
+        : trajectory of the course.
+    """
+
+    directions, values = data
+    forward = np.where(directions == FORWARD, values, 0)
+    hor_pos = np.concatenate(([0], np.cumsum(forward)))
+    aim = np.concatenate(([0], np.cumsum(directions * values)))
+    depth = np.concatenate(([0], np.cumsum(forward * aim[:-1])))
+
+    # each level only reads the elements after it, already computed
+    max_depth = np.empty(2 * depth.size, dtype=depth.dtype)
+    max_depth[depth.size:] = depth
+    max_depth[0] = np.iinfo(max_depth.dtype).min
+    high = depth.size
+    while high > 1:
+        low = (high + 1) // 2
+        np.maximum(max_depth[2 * low:2 * high:2],
+                   max_depth[2 * low + 1:2 * high:2], out=max_depth[low:high])
+        high = low
+
+    return Trajectory(hor_pos, depth, aim, max_depth)
+
+
+def position_after(trajectory: Trajectory, i):
+    """Finds where the submarine was after the first `i` instructions, in O(1).
+
+    Args:
+        trajectory: trajectory of the course.
+        i: number of instructions followed (an int or an array of them).
+
+    Returns:
+        : horizontal position, depth and aim after the instructions.
+    """
+
+    return trajectory.hor_pos[i], trajectory.depth[i], trajectory.aim[i]
+
+
+def max_depth_between(trajectory: Trajectory, i, j):
+    """Finds the maximum depth of the submarine between the positions after
+    the first `i` and the first `j` instructions (both included), in O(log n),
+    climbing the segment tree from both ends of the range and taking the
+    maximum of the elements that cover it.
+
+    Args:
+        trajectory: trajectory of the course.
+        i: number of instructions followed at the first position (an int or an
+            array of them).
+        j: number of instructions followed at the last position (an int or an
+            array of them).
+
+    Returns:
+        : maximum depth between the two positions.
+
+    Requires:
+        0 <= i <= j <= number of instructions.
+    """
+
+    tree, size = trajectory.max_depth, trajectory.depth.size
+    low, high = np.asarray(i) + size, np.asarray(j) + size + 1
+    if low.ndim == 0 and high.ndim == 0:
+        low, high, deepest = int(low), int(high), tree[0]
+        while low < high:
+            if low % 2 == 1:
+                deepest = max(deepest, tree[low])
+            if high % 2 == 1:
+                deepest = max(deepest, tree[high - 1])
+            low, high = (low + 1) // 2, high // 2
+        return deepest
+
+    # the ranges that don't take an element at a level read element 0 instead
+    deepest = np.full(np.broadcast(low, high).shape, tree[0])
+    while (left := low < high).any():
+        deepest = np.maximum(
+            deepest, tree[np.where(left & (low % 2 == 1), low, 0)])
+        deepest = np.maximum(
+            deepest, tree[np.where(left & (high % 2 == 1), high - 1, 0)])
+        low, high = (low + 1) // 2, high // 2
+
+    return deepest
+
+
 ###############################################################################
 
 if __name__ == '__main__':
-    test_data = np.loadtxt("test_input.txt", dtype=str, delimiter=" ")
-    data = np.loadtxt("input.txt", dtype=str, delimiter=" ")
+    test_data = read_file("test_input.txt")
+    data = read_file("input.txt")
     
     print("Part 1 " + "-"*30)
     part1(test_data, data)
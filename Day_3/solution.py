@@ -1,120 +1,250 @@
+import bisect
 import functools as ft
+import itertools as it
 import multiprocessing as mp
-import time
+import os
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from aoc.benchmark import compiles, timer
+from aoc.stream import read_lines
 
 
 ##############################################################################
 
-def read_file(filename: str) -> list:
-    """Opens a file and reads it into a list.
+class Report(NamedTuple):
+    """Diagnostic report with each line packed into unsigned integers. Rows of
+    up to 64 bits are packed into a single integer of the smallest unsigned
+    type that holds them; wider rows are split into uint64 words, the first
+    word holding the most significant bits. Unused bits are the most
+    significant ones, so every row (or its words, concatenated) is the number
+    of the line.
+    """
+
+    words: np.ndarray
+    width: int
+
+
+def word_type(width: int) -> tuple:
+    """Chooses how to pack rows of bits.
+
+    Args:
+        width: number of bits of each row.
+
+    Returns:
+        dtype: unsigned integer type of the words.
+        n_words: number of words of each row.
+    """
+
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if width <= np.iinfo(dtype).bits:
+            return dtype, 1
+    return np.uint64, -(-width // 64)
+
+
+def pack_bits(bits: np.ndarray) -> Report:
+    """Packs rows of bits into unsigned integers.
+
+    Args:
+        bits: boolean array with one row per line of the report.
+
+    Returns:
+        : packed report.
+    """
+
+    n_rows, width = bits.shape
+    dtype, n_words = word_type(width)
+    word_bits = np.iinfo(dtype).bits
+    padded = np.zeros((n_rows, n_words * word_bits), dtype=bool)
+    padded[:, padded.shape[1] - width:] = bits
+
+    big_endian = np.dtype(dtype).newbyteorder(">")
+    words = np.packbits(padded, axis=1).view(big_endian).astype(dtype)
+    return Report(words.reshape(n_rows, n_words), width)
+
+
+def parse_report(raw: np.ndarray) -> Report:
+    """Packs the bytes of a report, whose lines all have the same length.
+
+    Args:
+        raw: bytes of the report, as an uint8 array.
+
+    Returns:
+        : packed report.
+    """
+
+    raw = raw[raw != ord("\r")]
+    content = np.flatnonzero(raw != ord("\n"))
+    if content.size == 0:
+        return pack_bits(np.zeros((0, 0), dtype=bool))
+
+    raw = np.append(raw[:content[-1] + 1], np.uint8(ord("\n")))
+    width = int(np.argmax(raw == ord("\n")))
+    return pack_bits(raw.reshape(-1, width + 1)[:, :width] == ord("1"))
+
+
+def read_file(filename: str) -> Report:
+    """Opens a file and reads it into a packed report.
 
     Args:
         filename: name of the file to read its input.
 
     Returns:
-        data: list of lines of the files as strings.
+        : packed report, see `Report`.
     
     Requires:
         filename must the name of a valid file.
+        every line must have the same number of bits.
+    """
+
+    return parse_report(np.fromfile(filename, dtype=np.uint8))
+
+
+def read_stream(filename: str) -> Iterator[str]:
+    """Reads the diagnostic report from the file one line at a time.
+
+    Args:
+        filename: name of the file with the data, or "-" for the standard
+            input.
+
+    Returns:
+        : lines of the report.
     """
 
-    with open(filename, 'r', encoding='utf8') as datafile:
-        data = datafile.read().splitlines()
-    return data
+    return read_lines(filename)
 
 
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
+def pack_lines(lines: Iterable[str], batch: int=1 << 16) -> Report:
+    """Packs the lines of a report, converting them in batches.
 
     Args:
-        function: function to time.
+        lines: lines of the report.
+        batch (optional): number of lines converted at a time. Defaults to
+            65536.
+
+    Returns:
+        : packed report.
     """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
+
+    lines = iter(lines)
+    chunks = []
+    while chunk := list(it.islice(lines, batch)):
+        raw = np.frombuffer("".join(chunk).encode(), dtype=np.uint8)
+        chunks.append(pack_bits(raw.reshape(len(chunk), -1) == ord("1")))
+
+    if not chunks:
+        return pack_bits(np.zeros((0, 0), dtype=bool))
+    return Report(np.concatenate([words for words, _ in chunks]),
+                  chunks[0].width)
+
+
+def row_value(words: np.ndarray) -> int:
+    """Converts the words of a packed row into the number of the row.
+    """
+
+    result = 0
+    for word in words:
+        result = (result << int(word.itemsize * 8)) | int(word)
+    return result
 
 
 ###############################################################################
 # part 1
 
-def sum_till_half(data: list, index: int) -> str:
-    """Determines the most common value in the column.
+def count_ones(data: Report) -> np.ndarray:
+    """Counts the ones of each column of the report, with one vectorized count
+    per column over the packed words.
 
     Args:
-        data: data in which to find the most common value in one of its columns.
-        index: index of the column of the data to determine its most common 
-            value.
+        data: packed report.
 
     Returns:
-        : most common value in column.
-    
-    Requires:
-        the only possible values for elements of the column of the data are 0
-            and 1.
+        counts: number of ones of each column, the most significant first.
     """
-    
-    result = 0
-    half_length = len(data) // 2
-    for row in data:
-        result += int(row[index])
-        if result > half_length:
-            return "1"
-    
-    return "0"
 
+    words, width = data
+    word_bits = words.itemsize * 8
+    padding = words.shape[1] * word_bits - width
 
-def find_gamma(data: list) -> str:
-    """Finds the most common element in each column of the data and generates a 
-    binary number where at each position there is the most common number of each
-    column of the same index.
+    counts = np.empty(width, dtype=np.int64)
+    for column in range(width):
+        word, bit = divmod(padding + column, word_bits)
+        mask = words.dtype.type(1 << (word_bits - 1 - bit))
+        counts[column] = np.count_nonzero(words[:, word] & mask)
+    return counts
+
+
+def find_gamma(counts: Iterable[int], n_rows: int) -> int:
+    """Builds the gamma rate, whose bits are the most common bits of each
+    column (1 if there are more ones than half of the rows).
 
     Args:
-        data: data from which the columns are used to generate the binary 
-            number.
+        counts: number of ones of each column, the most significant first.
+        n_rows: number of rows of the report.
 
     Returns:
-        : binary number of the most common number per column of the data.
-    
-    Requires:
-        each element of the data must contain only 1s and 0s.
+        gamma: gamma rate.
     """
 
-    sums = list(map(ft.partial(sum_till_half, data), range(len(data[0]))))
-    
-    return "".join(sums)
+    gamma = 0
+    for ones in counts:
+        gamma = (gamma << 1) | (int(ones) > n_rows // 2)
+    return gamma
 
 
-def invert_bin_2_int(bin_num: str) -> int:
-    """Inverts the bits of a binary number and converts the resulting binary
-    number into an int.
+def gamma_epsilon(counts: Iterable[int], n_rows: int, width: int) -> int:
+    """Calculates the product of the gamma and epsilon rates, the epsilon rate
+    having the inverted bits of the gamma rate.
     """
 
-    result = ""
-    for i in bin_num:
-        result += "1" if i == "0" else "0"
-    return int(result, 2)
+    gamma = find_gamma(counts, n_rows)
+    return gamma * (gamma ^ ((1 << width) - 1))
 
 
 @timer
-def determ_gamma_epsilon(data: list) -> int:
+def determ_gamma_epsilon(data: Report) -> int:
     """It calculates the product of the gamma and epsilon values obtained from 
     the data given.
 
     Args:
-        data: data from which the gamma and epsilon values are to be obtained.
+        data: packed report from which the gamma and epsilon values are to be
+            obtained.
+
+    Returns:
+        : product of the gamma and epsilon values.
+    """
+
+    words, width = data
+    return gamma_epsilon(count_ones(data), words.shape[0], width)
+
+
+@timer
+def determ_gamma_epsilon_stream(data: Iterable[str]) -> int:
+    """Streaming version of `determ_gamma_epsilon`: counts the ones of each
+    column in a single pass over the data, so only the counts are kept in
+    memory.
+
+    Args:
+        data: lines of the report.
 
     Returns:
         : product of the gamma and epsilon values.
     """
-    gamma = find_gamma(data)
-    return invert_bin_2_int(gamma) * int(gamma, 2)
 
+    counts = []
+    n_rows = 0
+    for row in data:
+        if not counts:
+            counts = [0] * len(row)
+        for index, bit in enumerate(row):
+            counts[index] += bit == "1"
+        n_rows += 1
 
-def part1(test_data: list, data: list):
+    return gamma_epsilon(counts, n_rows, len(counts))
+
+
+def part1(test_data: Report, data: Report):
     """Solves the first part of the problem for day 3.
 
     Args:
@@ -127,150 +257,207 @@ def part1(test_data: list, data: list):
 
 
 ##############################################################################
-# create a Prefix Tree (or Trie) class
+# create a Prefix Tree (or Trie) with flat arrays
 
-class TrieNode():
-    """Node of the Prefix Tree (or Trie) data structure.
+class Trie(NamedTuple):
+    """Binary prefix tree (or trie) stored in flat arrays. Node 0 is the root;
+    `children[node, bit]` is the child of a node for the next bit (0 if there
+    is none, since the root is nobody's child) and `counts[node]` the number of
+    keys that go through the node.
     """
 
-    def __init__(self, next_nodes: dict):
-        self.next = next_nodes
-    
+    children: np.ndarray
+    counts: np.ndarray
 
-    def is_empty(self) -> bool:
-        """Determines if the current node, has any child nodes. If it hasn't it
-        returns true, and false, otherwise.
-        """
-        return len(self.next) == 0
 
+def max_trie_nodes(n_keys: int, width: int) -> int:
+    """Bounds the number of nodes of a trie: level l has at most 2**l nodes
+    and at most one node per key.
+    """
+
+    return 1 + sum(min(1 << level, n_keys) for level in range(1, width + 1))
 
 
-def add_trie_node(node: TrieNode, key: str):
-    """Adds a node to a another trie node or to a trie.
+def add_trie_nodes(words: np.ndarray, width: int, word_bits: int,
+                   children: np.ndarray, counts: np.ndarray) -> int:
+    """Adds every row of a packed report to a trie, walking down from the root
+    one bit at a time and creating the missing nodes. Compiled with numba by
+    `trie_kernel`.
 
     Args:
-        node: trie node or trie to which add a node.
-        key: value of the node and each child node it must have before 
-            adding it to the trie or trie node.
+        words: packed rows of the report.
+        width: number of bits of each row.
+        word_bits: number of bits of each word.
+        children: children of each node, with room for every node.
+        counts: number of keys that go through each node.
+
+    Returns:
+        n_nodes: number of nodes of the trie.
     """
 
-    value, *rest = key
+    padding = words.shape[1] * word_bits - width
+    n_nodes = 1
+    for row in range(words.shape[0]):
+        node = 0
+        counts[0] += 1
+        for column in range(width):
+            word, bit = divmod(padding + column, word_bits)
+            shift = np.uint64(word_bits - 1 - bit)
+            value = (np.uint64(words[row, word]) >> shift) & np.uint64(1)
+            child = children[node, value]
+            if child == 0:
+                child = n_nodes
+                children[node, value] = child
+                n_nodes += 1
+            counts[child] += 1
+            node = child
+    return n_nodes
+
+
+@ft.lru_cache(maxsize=None)
+def trie_kernel():
+    """Compiles `add_trie_nodes` with numba the first time it is needed, so that
+    importing the module (and solving part 1) doesn't import numba.
+    """
 
-    if len(rest) > 0:
-        if value in node.next:
-            node.next[value][0] += 1
-        else:
-            node.next[value] = [1, TrieNode({})]
-        add_trie_node(node.next[value][1], rest)
-    
-    elif value in node.next:
-        node.next[value][0] += 1
-    else:
-        node.next[value] = [1, TrieNode({})]
+    import numba as nb
+
+    return nb.njit(cache=True)(add_trie_nodes)
 
 
-def generate_trie(trie_nodes: list) -> TrieNode:
-    """Generates a prefix tree (or trie).
+def trie_inputs(data: Report, size: int) -> tuple:
+    """Creates the inputs of `add_trie_nodes` for a report.
 
     Args:
-        trie_nodes: keys to add to the prefix tree being generated
+        data: packed report whose rows are the keys of the trie.
+        size: number of nodes the arrays of the trie have room for.
 
     Returns:
-        root: root node of the prefix tree.
+        : rows, their width, the number of bits of each word and the empty
+            children and counts of the trie.
     """
 
-    root = TrieNode({})
-    for key in trie_nodes:
-        add_trie_node(root, key)
-    return root
+    words, width = data
+    largest = max_trie_nodes(words.shape[0], width)
+    dtype = np.int32 if largest < np.iinfo(np.int32).max else np.int64
+    return (words, width, words.itemsize * 8,
+            np.zeros((size, 2), dtype=dtype), np.zeros(size, dtype=dtype))
+
+
+def generate_trie(data: Report) -> Trie:
+    """Generates a prefix tree (or trie) of the rows of a report, in arrays
+    preallocated for the largest possible trie.
+
+    Args:
+        data: packed report whose rows are the keys of the trie.
+
+    Returns:
+        : prefix tree, trimmed to its nodes.
+    """
+
+    inputs = trie_inputs(data, max_trie_nodes(data[0].shape[0], data[1]))
+    n_nodes = trie_kernel()(*inputs)
+    children, counts = inputs[3:]
+    return Trie(children[:n_nodes], counts[:n_nodes])
 
 
 
 ##############################################################################
 # part 2
 
-def get_trie_values(trie_node: TrieNode) -> list:
-    """Generates a list of the possible values the a key can have starting from
-    the current node. 
+def get_trie_values(trie: Trie) -> list:
+    """Generates a list of the keys in the trie.
         THIS FUNCTION IS ONLY USED FOR DEBUGGING.
 
     Args:
-        trie_node: starting point from which to determine the possible keys.
+        trie: prefix tree.
 
     Returns:
-        result: list of keys that are in the trie that takes the trie_node as 
-        the root node.
+        result: list of keys that are in the trie.
     """
 
-    if trie_node.is_empty():
-        return [""]
     result = []
-
-    for i in trie_node.next:
-        for j in get_trie_values(trie_node.next[i][1]):
-            result.append(i+j)
+    pending = [(0, "")]
+    while pending:
+        node, key = pending.pop()
+        if not trie.children[node].any():
+            result.append(key)
+        for bit in (1, 0):
+            if trie.children[node, bit]:
+                pending.append((trie.children[node, bit], key + str(bit)))
     return result
 
 
-def find_common(trie_root: TrieNode, most: bool) -> str:
+def find_common(trie: Trie, most: bool) -> str:
     """Finds either the most common value or the least common value at each 
     child node with the most (or least, respectively) common value and returns 
     the key formed by concatenating these values. If a node as only one value, 
     that value is concatenated into the key. If a node doesn't have any values, 
-    that returns an empty string or finalizes the key.
+    that finalizes the key.
 
     Args:
-        trie_root: node from which to obtain the most (or least) common value at
-            each one of its child nodes to form the key.
+        trie: prefix tree from which to obtain the most (or least) common value
+            at each one of its nodes to form the key.
         most: flag that indicates if the most common value is wanted or if the
             least common value is wanted. If it is set to true, it will obtain
             keys based on the most common value.
 
     Returns:
-        : key obtained by recursively obtaining the most (or least) common value
-        at each child node with the most (or least, respectively) common value. 
+        : key obtained by walking down from the root to the child with the most
+        (or least, respectively) common value.
     """
 
-    next_values = trie_root.next
-    
-    if len(next_values) == 0:
-        return ""
-    elif len(next_values) == 1:
-        value = list(next_values.keys())[0]
-        return value + find_common(trie_root.next[value][1], most)
-    else:
-        fst, fst_node = next_values["0"]
-        snd, snd_node = next_values["1"]
-        
-        if most:
-            if fst <= snd:
-                return "1" + find_common(snd_node, most)
-            return "0" + find_common(fst_node, most)
-        if fst <= snd:
-            return "0" + find_common(fst_node, most)
-        return "1" + find_common(snd_node, most)
+    children, counts = trie
+    key = []
+    node = 0
+    while True:
+        zero, one = children[node]
+        if zero and one:
+            bit = (counts[zero] <= counts[one]) == most
+        elif zero or one:
+            bit = bool(one)
+        else:
+            return "".join(key)
+        key.append("1" if bit else "0")
+        node = one if bit else zero
 
 
 @timer
-def obtain_ox_diox_gen(data: list) -> int:
+@compiles(lambda data: [(trie_kernel(), trie_inputs(data, 1))])
+def obtain_ox_diox_gen(data: Report) -> int:
     """Obtains the oxygen generator and the CO2 scrubber rating.
 
     Args:
-        data: data from which to obtain the oxygen generator and the CO2 
-            scrubber rating.
+        data: packed report from which to obtain the oxygen generator and the
+            CO2 scrubber rating.
 
     Returns:
         : product of the oxygen generator and the CO2 scrubber rating. 
     """
 
-    root = generate_trie(data)
-    ox_gen = int(find_common(root, True), 2)
-    diox_gen = int(find_common(root, False), 2)
+    trie = generate_trie(data)
+    ox_gen = int(find_common(trie, True), 2)
+    diox_gen = int(find_common(trie, False), 2)
 
     return ox_gen * diox_gen
 
 
-def part2(test_data: list, data: list):
+@timer
+def obtain_ox_diox_gen_stream(data: Iterable[str]) -> int:
+    """Streaming version of `obtain_ox_diox_gen`. Every line is needed to find
+    the ratings, so the lines are packed (in batches) as they are read.
+
+    Args:
+        data: lines of the report.
+
+    Returns:
+        : product of the oxygen generator and the CO2 scrubber rating.
+    """
+
+    return obtain_ox_diox_gen.__wrapped__(pack_lines(data))
+
+
+def part2(test_data: Report, data: Report):
     """Solves the second part of the problem for day 3.
 
     Args:
@@ -282,6 +469,286 @@ def part2(test_data: list, data: list):
     obtain_ox_diox_gen(data)
 
 
+###############################################################################
+# part 2, sort and partition
+
+def sort_report(data: Report) -> np.ndarray:
+    """Sorts the rows of a packed report by their numbers.
+
+    Args:
+        data: packed report.
+
+    Returns:
+        : sorted packed rows.
+    """
+
+    words, _ = data
+    if words.shape[1] == 1:
+        return np.sort(words, axis=0)
+    return words[np.lexsort(words.T[::-1])]
+
+
+def find_rating(rows: np.ndarray, width: int, most: bool) -> int:
+    """Applies the bit criteria to sorted rows. The rows that are left always
+    form a contiguous range that shares the bits already considered, so the
+    rows with a 0 in the next bit come before the ones with a 1, and a binary
+    search splits the range in two. Ties, and ranges with a single value of the
+    bit, are decided like in `find_common`.
+
+    Args:
+        rows: sorted packed rows.
+        width: number of bits of each row.
+        most: if true, the most common bit is kept at each step (oxygen
+            generator rating), otherwise the least common one (CO2 scrubber
+            rating).
+
+    Returns:
+        : rating, the number of the last row left.
+    """
+
+    word_bits = rows.itemsize * 8
+    padding = rows.shape[1] * word_bits - width
+    low, high = 0, rows.shape[0]
+
+    for column in range(width):
+        if high - low == 1:
+            break
+        word, bit = divmod(padding + column, word_bits)
+        shift = word_bits - 1 - bit
+
+        def bit_of(row: int) -> int:
+            return int(rows[row, word]) >> shift & 1
+
+        split = bisect.bisect_left(range(low, high), 1, key=bit_of)
+        zeros, ones = split, high - low - split
+
+        if zeros and ones:
+            keep_ones = (zeros <= ones) == most
+        else:
+            keep_ones = ones > 0
+        if keep_ones:
+            low += split
+        else:
+            high = low + split
+
+    return row_value(rows[low])
+
+
+@timer
+def obtain_ox_diox_gen_sorted(data: Report) -> int:
+    """Obtains the oxygen generator and the CO2 scrubber rating without a trie:
+    the report is sorted once, in O(n log n), and each step of the bit criteria
+    is a binary search in the range of rows left.
+
+    Args:
+        data: packed report from which to obtain the oxygen generator and the
+            CO2 scrubber rating.
+
+    Returns:
+        : product of the oxygen generator and the CO2 scrubber rating.
+    """
+
+    rows = sort_report(data)
+    _, width = data
+    return find_rating(rows, width, True) * find_rating(rows, width, False)
+
+
+###############################################################################
+# fleet of reports
+
+def merge_rows(rows: np.ndarray, new_rows: np.ndarray) -> np.ndarray:
+    """Merges sorted packed rows into other sorted packed rows in O(n), without
+    sorting them again: each new row is inserted where a binary search over
+    the rows (compared word by word) places it.
+
+    Args:
+        rows: sorted packed rows.
+        new_rows: sorted packed rows to add.
+
+    Returns:
+        : sorted packed rows of both arrays.
+    """
+
+    row_type = np.dtype([(f"w{i}", rows.dtype) for i in range(rows.shape[1])])
+    places = np.searchsorted(rows.view(row_type).ravel(),
+                             new_rows.view(row_type).ravel())
+    return np.insert(rows, places, new_rows, axis=0)
+
+
+def count_report(filename: str, state: tuple=None) -> tuple:
+    """Packs and sorts the rows and counts the ones of each column of a report
+    file, starting from the rows and counts of a previous call, so that when
+    lines were appended to the file only the new lines are read, packed,
+    sorted and counted, and then merged into the sorted rows already known.
+    The rows and counts kept for the next call only cover complete lines
+    (ending in a newline). A last line without one is included for this call if
+    it has all its bits, and is read again by the next call, so that a line
+    being written is never used half-way.
+
+    Args:
+        filename: name of the report file.
+        state (optional): state returned by the previous call for the same
+            file. Defaults to reading the whole file.
+
+    Returns:
+        state: offset of the first byte not read, packed rows and number of
+            ones of each column of the complete lines, to pass to the next
+            call.
+        report (Report): packed rows of the report, sorted by their numbers.
+        counts: number of ones of each column of the report.
+    """
+
+    def add_rows(chunk: np.ndarray, report: Report, counts: np.ndarray):
+        new_report = parse_report(chunk)
+        if new_report.words.shape[0] == 0:
+            return report, counts
+        new_counts = count_ones(new_report)
+        new_rows = sort_report(new_report)
+        if report is None:
+            return Report(new_rows, new_report.width), new_counts
+        return (Report(merge_rows(report.words, new_rows), report.width),
+                counts + new_counts)
+
+    offset, report, counts = state or (0, None, None)
+    if os.path.getsize(filename) < offset:
+        offset, report, counts = 0, None, None
+
+    raw = np.fromfile(filename, dtype=np.uint8, offset=offset)
+    newlines = np.flatnonzero(raw == ord("\n"))
+    complete = int(newlines[-1]) + 1 if newlines.size else 0
+
+    report, counts = add_rows(raw[:complete], report, counts)
+    state = (offset + complete, report, counts)
+    tail = raw[complete:]
+    tail = tail[(tail != ord("\r")) & (tail != ord(" "))]
+    if report is None or tail.size == report.width:
+        report, counts = add_rows(tail, report, counts)
+
+    return state, report, counts
+
+
+def solve_report(filename: str, state: tuple=None) -> tuple:
+    """Solves both parts for one report file, see `count_report`: only the new
+    lines are read, packed and sorted, and the ratings are found with binary
+    searches over the sorted rows of the whole report, see `find_rating`.
+
+    Args:
+        filename: name of the report file.
+        state (optional): state of the previous call for the same file.
+
+    Returns:
+        state: state for the next call.
+        answers: product of the gamma and epsilon rates and product of the
+            oxygen generator and CO2 scrubber ratings.
+    """
+
+    state, report, counts = count_report(filename, state)
+    rows, width = report
+    part_1 = gamma_epsilon(counts, rows.shape[0], width)
+    part_2 = find_rating(rows, width, True) * find_rating(rows, width, False)
+    return state, (part_1, part_2)
+
+
+# states of the reports solved by a worker process of a Fleet, by file name
+REPORT_STATES = {}
+
+
+def solve_reports(filenames: list) -> list:
+    """Solves both parts for each report file in a worker process of a Fleet,
+    keeping the state of each report in the worker, see `solve_report`.
+
+    Args:
+        filenames: absolute names of the report files.
+
+    Returns:
+        : answers of each report, in the same order as the files.
+    """
+
+    results = []
+    for filename in filenames:
+        state, answers = solve_report(filename, REPORT_STATES.get(filename))
+        REPORT_STATES[filename] = state
+        results.append(answers)
+    return results
+
+
+class Fleet():
+    """Solves the reports of a fleet of submarines on worker processes shared
+    by every call. Each report is always solved by the same worker, which keeps
+    its sorted packed rows and column counts between calls, so that reports
+    that grew since the last call only have their new lines read and merged,
+    and only file names and answers go between the processes.
+    """
+
+    def __init__(self, processes: int=None):
+        self.owners = {}
+        self.pools = [mp.Pool(1) for _ in range(processes or os.cpu_count())]
+        self.loads = [0] * len(self.pools)
+
+
+    def solve(self, filenames: list) -> list:
+        """Solves both parts for each report, each worker solving its reports
+        while the others solve theirs.
+
+        Args:
+            filenames: names of the report files.
+
+        Returns:
+            : products of the gamma and epsilon rates and of the life support
+                ratings of each report, in the same order as the files.
+        """
+
+        paths = [os.path.abspath(filename) for filename in filenames]
+        jobs = [[] for _ in self.pools]
+        for path in paths:
+            if path not in self.owners:
+                self.owners[path] = self.loads.index(min(self.loads))
+                self.loads[self.owners[path]] += 1
+            jobs[self.owners[path]].append(path)
+
+        pending = [pool.apply_async(solve_reports, (batch,))
+                   for pool, batch in zip(self.pools, jobs) if batch]
+        answers = {}
+        for batch, result in zip([batch for batch in jobs if batch], pending):
+            answers.update(zip(batch, result.get()))
+        return [answers[path] for path in paths]
+
+
+    def close(self):
+        """Stops the worker processes.
+        """
+        for pool in self.pools:
+            pool.close()
+        for pool in self.pools:
+            pool.join()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@timer
+def solve_fleet(filenames: list, processes: int=None) -> list:
+    """Solves both parts for each report of a fleet, on a pool of processes.
+
+    Args:
+        filenames: names of the report files.
+        processes (optional): number of worker processes. Defaults to the
+            number of CPUs.
+
+    Returns:
+        : products of the gamma and epsilon rates and of the life support
+            ratings of each report.
+    """
+
+    with Fleet(processes) as fleet:
+        return fleet.solve(filenames)
+
+
 ###############################################################################
 
 if __name__ == '__main__':
@@ -1,188 +1,188 @@
+import concurrent.futures as cf
 import functools as ft
-import time
+import os
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+from aoc.benchmark import timer
 
 
 ###############################################################################
 
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
+def read_tile_shape(datafile) -> list:
+    """Reads the lines of the first tile of the file, which give the shape of
+    every tile.
 
     Args:
-        function: function to time.
+        datafile: file positioned after the numbers called.
+
+    Returns:
+        lines: numbers of each line of the first tile.
     """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
+
+    lines = []
+    while line := datafile.readline():
+        if line.strip():
+            lines.append(line.split())
+        elif lines:
+            break
+    return lines
 
 
-def read_file(filename: str) -> str:
+def read_file(filename: str, batch: int=1 << 24) -> tuple:
     """Opens a file and reads the numbers called during the bingo and the bingo
     cards (or tiles, as they shall be referred from here on).
 
+        The shape of the tiles (any number of lines and columns) is taken from
+    the first tile. The rest of the file is read in batches of characters, each
+    converted to integers at once, so the file is never held in memory as text
+    or as lists of numbers, only as the final contiguous array.
+
     Args:
         filename: name of the file to read its input.
+        batch (optional): number of characters read at a time. Defaults to
+            16777216.
 
     Returns:
-        : Numbers called during the bingo.
-        : Tiles (bingo cards). 
+        numbers (np.ndarray): Numbers called during the bingo.
+        tiles (np.ndarray): Tiles (bingo cards), as an array with one matrix
+            per tile.
     
     Requires:
         filename must the name of a valid file.
         numbers called during the bingo should be separated from the first tile
             by an empty line.
         tiles should be separated from each other with an empty line.
+        every tile must have the same number of lines and columns.
+
+    Raises:
+        ValueError: the numbers of the tiles don't fill a whole number of tiles.
     """
 
-    with open(filename) as datafile:
-        data = datafile.read().split("\n\n")
-    
-    numbers, *tiles = data
-    
-    return (list(map(int, numbers.split(","))), 
-            [list(map(int, tile.split())) for tile in tiles])
+    with open(filename, 'r', encoding='utf8') as datafile:
+        numbers = np.array(datafile.readline().split(","), dtype=np.int32)
+        first = read_tile_shape(datafile)
+        shape = (len(first), len(first[0]) if first else 0)
+
+        chunks = [np.array(first, dtype=np.int32).reshape(-1)]
+        rest = ""
+        while text := datafile.read(batch):
+            text = rest + text
+            cut = max(text.rfind(" "), text.rfind("\n")) + 1
+            chunks.append(np.array(text[:cut].split(), dtype=np.int32))
+            rest = text[cut:]
+        chunks.append(np.array(rest.split(), dtype=np.int32))
+
+    cells = np.concatenate(chunks)
+    if shape[0] * shape[1] == 0 or cells.size % (shape[0] * shape[1]):
+        raise ValueError(f"the tiles of {filename} don't all have "
+                         f"{shape[0]}x{shape[1]} numbers")
+    return numbers, cells.reshape(-1, *shape)
 
 
 ###############################################################################
-# Part 1
+# win times
 
-def prepare_data(tiles: list) -> list:
-    """Converts the numbers on each tile card into a dictionary where the keys
-    are the numbers and the values are the positions (coordinates) of where we
-    can find those numbers in the specific tile. Additionally, per tile, it also
-    creates a list of the number of values unmarked in each line and a list of
-    the number of values unmarked in each column.
+def draw_ranks(numbers: np.ndarray, tiles: np.ndarray) -> np.ndarray:
+    """Finds when each number of each tile is called. When the numbers span a
+    range not much larger than the input, a table indexed by the number (minus
+    the smallest one) gives the first call of each; otherwise the numbers of
+    the tiles are searched among the distinct numbers called, so the memory
+    used never depends on how large the numbers are.
 
     Args:
-        tiles: bingo cards used during the calling of the numbers.
+        numbers: numbers to be called during the bingo game.
+        tiles: tiles, as an array of matrices.
 
     Returns:
-        prep_tiles: list of tuples where each tuple contains information 
-            relative to one tile. The tuple contains a dictionary, with the 
-            numbers in the keys and their position on the tile as their value,
-            it contains a list with the number of unmarked numbers in the 
-            columns of the tile and it contains a list of the number of unmarked
-            numbers in the lines of the tiles.
+        : array with the shape of the tiles with the position, in the numbers
+            called, of the first call of each number of the tiles, or
+            len(numbers) for the numbers that are never called.
     """
 
-    prep_tiles = []
-    for tile in tiles:
-        cols = [0 for _ in range(5)]
-        lines = [0 for _ in range(5)]
-
-        corr_tiles = {}
-        for index, value in enumerate(tile):
-            cols[index % 5] += 1
-            lines[index // 5] += 1
-
-            if value not in corr_tiles:
-                corr_tiles[value] = []
-            corr_tiles[value].append((index % 5, index // 5))
-        
-        prep_tiles.append((corr_tiles, cols, lines))
-    
-    return prep_tiles
+    called, first = np.unique(numbers, return_index=True)
+    if called.size == 0 or tiles.size == 0:
+        return np.full(tiles.shape, len(numbers), dtype=np.int64)
 
+    low = min(int(called[0]), int(tiles.min()))
+    span = max(int(called[-1]), int(tiles.max())) - low + 1
+    if span <= 4 * (numbers.size + tiles.size):
+        lookup = np.full(span, len(numbers), dtype=np.int64)
+        lookup[np.subtract(called, low, dtype=np.int64)] = first
+        return lookup[np.subtract(tiles, low, dtype=np.int64)]
 
-def find_num(num: int, tile: tuple) -> tuple:
-    """Marks a number in the tile.
+    index = np.minimum(np.searchsorted(called, tiles), called.size - 1)
+    return np.where(called[index] == tiles, first[index], len(numbers))
 
-        It removes the number from the dictionary of numbers and their positions
-    in the tiles and it decreases the number of unmarked numbers in the lists of
-    the numbers of unmarked numbers per line and per column.
+
+def win_times(ranks: np.ndarray) -> np.ndarray:
+    """Finds when each tile wins: a line (or column) is fully marked when its
+    last number is called, and the tile wins with its first full line or
+    column.
 
     Args:
-        num: number to be marked (removed from the dictionary).
-        tile: information regarding the bingo card: dictionary of unmarked 
-            numbers and their positions in the tile, list of the number of 
-            unmarked numbers per column and list of the number of unmarked 
-            numbers per line.
+        ranks: when each number of each tile is called, see `draw_ranks`.
 
     Returns:
-        empty_col_or_line (bool): indicates if the tile has any fully marked 
-            column or line. If the flag is true, then the tile has has a fully
-            marked column or line.
-        tile_values (dict[int: tuple]): unmarked numbers in the tile associated
-            with their positions.
-        cols (list[int]): number of unmarked numbers in the tile per column.
-        lines (list[int]): number of unmarked numbers in the tile per line.
-
-    Requires:
-        the tiles should be 5x5, i.e., the tiles should have 5 lines (or rows)
-            and should have 5 columns.
+        : position, in the numbers called, of the number that makes each tile
+            win (len(numbers) if it never wins).
     """
 
-    tile_values, cols, lines = tile
-    empty_col_or_line = False
-
-    if num in tile_values:
-        t_col, t_line = tile_values[num].pop()
-        cols[t_col] -= 1
-        lines[t_line] -= 1
+    return np.minimum(ranks.max(axis=2).min(axis=1),
+                      ranks.max(axis=1).min(axis=1))
 
-        if len(tile_values[num]) == 0:
-            del tile_values[num]
 
-        if cols[t_col] < 1 or lines[t_line] < 1:
-            empty_col_or_line = True
-
-    return (empty_col_or_line, tile_values, cols, lines)
-
-
-def run_bingo(numbers: list, tiles: list) -> int:
-    """Runs the bingo game until some tile has won the game.
-
-        For every number that is called, it marks that number in each tile if
-    they have it and then it verifies if any tile has won the game. A game is
-    won when a line or column of numbers is fully marked. When this happens, it
-    returns the product of the sum of the unmarked numbers of the winning tile
-    and the number that made that tile win the game.
+def score(numbers: np.ndarray, tiles: np.ndarray, ranks: np.ndarray,
+          times: np.ndarray, winner: int) -> int:
+    """Calculates the score of a tile when it wins: the product of the sum of
+    its unmarked numbers and the number that made it win.
 
     Args:
         numbers: numbers to be called during the bingo game.
-        tiles: information relative to each tile.
-
-    Raises:
-        ValueError: since the game has to finish after all the numbers have been
-            called, it doesn't make sense for the game to not terminate. 
-            Therefore, it raises and exception indicating that something did not
-            go well.
+        tiles: tiles, as an array of matrices.
+        ranks: when each number of each tile is called.
+        times: when each tile wins.
+        winner: index of the tile.
 
     Returns:
-        : product of the sum of the unmarked numbers of the winning tile and the
-        number that made that tile win the game.
+        : score of the tile.
+
+    Raises:
+        ValueError: the tile never wins.
     """
 
-    for num in numbers:
-        result = list(map(ft.partial(find_num, num), tiles))
-        
-        tiles = []
-        for sol, tile, cols, lines in result:
-            if sol:
-                return sum(tile.keys())*num
-            tiles.append((tile, cols, lines))
+    time = int(times[winner])
+    if time >= len(numbers):
+        raise ValueError(f"tile {winner} never wins")
+    unmarked = tiles[winner][ranks[winner] > time]
+    return int(unmarked.sum()) * int(numbers[time])
 
-    raise ValueError("run_bingo failed")
 
+###############################################################################
+# Part 1
 
 @timer
 def find_fst_winner(data: tuple) -> int:
     """Finds the result of the bingo game, according to the tiles and the 
-    numbers in the data.
+    numbers in the data: the tile that wins first, see `win_times`. If several
+    tiles win with the same number, the first of them wins.
 
     Args:
-        data: numbers to be called during the bingo game and the information
-            regarding the tiles.
+        data: numbers to be called during the bingo game and the tiles.
 
     Returns:
         : result of the game.
+
+    Raises:
+        ValueError: no tile wins the game.
     """
 
     numbers, tiles = data
-    return run_bingo(numbers, prepare_data(tiles))
+    ranks = draw_ranks(numbers, tiles)
+    times = win_times(ranks)
+    return score(numbers, tiles, ranks, times, int(np.argmin(times)))
 
 
 def part1(test_data, data):
@@ -200,70 +200,335 @@ def part1(test_data, data):
 ###############################################################################
 # Part 2
 
-def run_bingo_until_last(numbers: list, tiles: list) -> int:
-    """Runs the bingo game until the last tile has won the game.
-
-        For every number that is called, it marks that number in each tile if
-    they have it and then it verifies if any tile has won the game. When the 
-    last tile wins the game, it returns the product of the sum of the unmarked 
-    numbers of that tile and the number that made that tile win the game.
+@timer
+def find_last_winner(data: tuple) -> int:
+    """Finds the result of the last winner of the bingo game, according to the 
+    tiles and the numbers in the data: the tile that wins last, see
+    `win_times`. If several tiles win last with the same number, the first of
+    them is the last winner.
 
     Args:
-        numbers: numbers to be called during the bingo game.
-        tiles: information relative to each tile.
+        data: numbers to be called during the bingo game and the tiles.
+
+    Returns:
+        : result of the last winner of the game.
 
     Raises:
-        ValueError: since the game has to finish after all the numbers have been
-            called, it doesn't make sense for the game to not terminate. 
-            Therefore, it raises and exception indicating that something did not
-            go well.
+        ValueError: some tile never wins the game.
+    """
+
+    numbers, tiles = data
+    ranks = draw_ranks(numbers, tiles)
+    times = win_times(ranks)
+    return score(numbers, tiles, ranks, times, int(np.argmax(times)))
+
+
+def part2(test_data, data):
+    """Solves the second part of the problem for day 4.
+
+    Args:
+        test_data: small dataset provided to test the algorithm
+        data: dataset used to solve part 2 of the problem
+    """
+
+    find_last_winner(test_data)
+    find_last_winner(data)
+
+
+###############################################################################
+# live games
+
+class BingoGame():
+    """Bingo game where the numbers are called one at a time.
+
+        The cells of every tile are indexed by their number (an inverted index
+    from each number to the cells holding it), and the game keeps the number of
+    unmarked cells of each line and column of each tile and the sum of the
+    unmarked numbers of each tile, in preallocated arrays. So calling a number
+    only touches the cells that hold it, however many tiles there are.
+    """
+
+    def __init__(self, tiles: np.ndarray):
+        n_tiles, n_lines, n_cols = tiles.shape
+        cells = tiles.reshape(-1)
+        order = np.argsort(cells, kind="stable")
+        self.values, starts = np.unique(cells[order], return_index=True)
+        self.starts = np.append(starts, cells.size)
+        self.postings = order
+
+        self.shape = tiles.shape
+        self.marked = np.zeros(cells.size, dtype=bool)
+        self.lines = np.full((n_tiles, n_lines), n_cols, dtype=np.int64)
+        self.cols = np.full((n_tiles, n_cols), n_lines, dtype=np.int64)
+        self.unmarked = tiles.sum(axis=(1, 2), dtype=np.int64)
+        self.won = np.zeros(n_tiles, dtype=bool)
+        self.n_won = 0
+
+
+    def call(self, number: int) -> tuple:
+        """Marks a number in every tile that has it.
+
+        Args:
+            number: number called.
+
+        Returns:
+            winners (np.ndarray): tiles that won with this number, in order.
+            scores (np.ndarray): score of each of these tiles, the product of
+                the sum of its unmarked numbers and the number called.
+        """
+
+        index = np.searchsorted(self.values, number)
+        if index == self.values.size or self.values[index] != number:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        cells = self.postings[self.starts[index]:self.starts[index + 1]]
+        cells = cells[~self.marked[cells]]
+        self.marked[cells] = True
+
+        tile, cell = np.divmod(cells, self.shape[1] * self.shape[2])
+        line, col = np.divmod(cell, self.shape[2])
+        np.add.at(self.lines, (tile, line), -1)
+        np.add.at(self.cols, (tile, col), -1)
+        np.add.at(self.unmarked, tile, -number)
+
+        full = (self.lines[tile, line] == 0) | (self.cols[tile, col] == 0)
+        winners = np.unique(tile[full & ~self.won[tile]])
+        self.won[winners] = True
+        self.n_won += winners.size
+        return winners, self.unmarked[winners] * number
+
+
+@timer
+def find_fst_winner_incremental(data: tuple) -> int:
+    """Finds the result of the bingo game, calling the numbers one at a time in
+    a `BingoGame`.
+
+    Args:
+        data: numbers to be called during the bingo game and the tiles.
 
     Returns:
-        : product of the sum of the unmarked numbers of the last winning tile 
-            and the number that made that tile win the game.
+        : result of the game.
+
+    Raises:
+        ValueError: no tile wins the game.
     """
 
-    for num in numbers:
-        result = list(map(ft.partial(find_num, num), tiles))
-        
-        tiles = []
-        for sol, tile, cols, lines in result:
-            if not sol:
-                tiles.append((tile, cols, lines))
-        
-        if len(tiles) == 0:
-            return sum(result[0][1].keys())*num
+    numbers, tiles = data
+    game = BingoGame(tiles)
+    for number in numbers:
+        winners, scores = game.call(number)
+        if winners.size:
+            return int(scores[0])
 
-    raise ValueError("run_bingo_until_last failed")
+    raise ValueError("no tile wins the game")
 
 
 @timer
-def find_last_winner(data: tuple) -> int:
-    """Finds the result of the last winner of the bingo game, according to the 
-    tiles and the numbers in the data.
+def find_last_winner_incremental(data: tuple) -> int:
+    """Finds the result of the last winner of the bingo game, calling the
+    numbers one at a time in a `BingoGame`.
 
     Args:
-        data: numbers to be called during the bingo game and the information
-            regarding the tiles.
+        data: numbers to be called during the bingo game and the tiles.
 
     Returns:
         : result of the last winner of the game.
+
+    Raises:
+        ValueError: some tile never wins the game.
     """
 
     numbers, tiles = data
-    return run_bingo_until_last(numbers, prepare_data(tiles))
+    game = BingoGame(tiles)
+    for number in numbers:
+        winners, scores = game.call(number)
+        if winners.size and game.n_won == len(tiles):
+            return int(scores[0])
 
+    raise ValueError("some tile never wins the game")
 
-def part2(test_data, data):
-    """Solves the second part of the problem for day 4.
+
+###############################################################################
+# sharded tournament
+
+class Ranking(NamedTuple):
+    """Order in which the tiles win, with their win times and scores. Tiles
+    that never win come last, with time len(numbers) and score -1.
+    """
+    order: np.ndarray
+    times: np.ndarray
+    scores: np.ndarray
+
+
+def tile_scores(numbers: np.ndarray, tiles: np.ndarray, ranks: np.ndarray,
+                times: np.ndarray) -> np.ndarray:
+    """Calculates the score of every tile when it wins, see `score`.
 
     Args:
-        test_data: small dataset provided to test the algorithm
-        data: dataset used to solve part 2 of the problem
+        numbers: numbers to be called during the bingo game.
+        tiles: tiles, as an array of matrices.
+        ranks: when each number of each tile is called.
+        times: when each tile wins.
+
+    Returns:
+        : score of each tile, or -1 for the tiles that never win.
     """
 
-    find_last_winner(test_data)
-    find_last_winner(data)
+    unmarked = np.where(ranks > times[:, None, None], tiles, 0)
+    called = np.append(numbers, 0)[times]
+    return np.where(times < len(numbers),
+                    unmarked.sum(axis=(1, 2), dtype=np.int64) * called, -1)
+
+
+def score_shard(shared: tuple, numbers: np.ndarray, shard: tuple,
+                ranking: bool=False) -> tuple:
+    """Finds the first and last winners of a shard of the tiles, which are read
+    from shared memory.
+
+    Args:
+        shared: name of the shared memory block, shape and dtype of the tiles.
+        numbers: numbers to be called during the bingo game.
+        shard: index of the first tile of the shard and of the tile after its
+            last one.
+        ranking (optional): if true, the win times and scores of every tile of
+            the shard are also returned. Defaults to False.
+
+    Returns:
+        first: win time, index and score of the first winner of the shard.
+        last: win time, index and score of the last winner of the shard (score
+            None if it never wins).
+        times (np.ndarray): when each tile of the shard wins (only if ranking).
+        scores (np.ndarray): score of each tile of the shard (only if ranking).
+    """
+
+    name, shape, dtype = shared
+    start, end = shard
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        tiles = np.ndarray(shape, dtype=dtype, buffer=block.buf)[start:end]
+        ranks = draw_ranks(numbers, tiles)
+        times = win_times(ranks)
+
+        winners = [int(np.argmin(times)), int(np.argmax(times))]
+        results = []
+        for winner in winners:
+            time = int(times[winner])
+            points = (score(numbers, tiles, ranks, times, winner)
+                      if time < len(numbers) else None)
+            results.append((time, start + winner, points))
+        if ranking:
+            results += [times, tile_scores(numbers, tiles, ranks, times)]
+        del tiles, ranks
+    finally:
+        block.close()
+
+    return tuple(results)
+
+
+def play_shards(data: tuple, workers: int=None, ranking: bool=False) -> list:
+    """Splits the tiles in one shard per worker process and finds the winners
+    of each shard. The tiles are copied once to a shared memory block, which
+    every worker reads without copying it.
+
+    Args:
+        data: numbers to be called during the bingo game and the tiles.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+        ranking (optional): if true, the win times and scores of every tile are
+            also found, see `score_shard`. Defaults to False.
+
+    Returns:
+        : results of each shard, in the order of the tiles.
+    """
+
+    numbers, tiles = data
+    workers = workers or os.cpu_count()
+    bounds = np.linspace(0, len(tiles), workers + 1).astype(int)
+    shards = [(int(start), int(end)) for start, end in zip(bounds, bounds[1:])
+              if end > start]
+
+    block = shared_memory.SharedMemory(create=True, size=max(tiles.nbytes, 1))
+    try:
+        view = np.ndarray(tiles.shape, dtype=tiles.dtype, buffer=block.buf)
+        view[...] = tiles
+        del view
+        shared = (block.name, tiles.shape, tiles.dtype.str)
+        with cf.ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                ft.partial(score_shard, shared, np.asarray(numbers),
+                           ranking=ranking), shards))
+    finally:
+        block.close()
+        block.unlink()
+
+
+@timer
+def find_fst_winner_sharded(data: tuple, workers: int=None) -> int:
+    """Sharded version of `find_fst_winner`: the first winner is the earliest
+    of the first winners of the shards (the first of them, on ties).
+
+    Args:
+        data: numbers to be called during the bingo game and the tiles.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        : result of the game.
+
+    Raises:
+        ValueError: no tile wins the game.
+    """
+
+    firsts = [shard[0] for shard in play_shards(data, workers)
+              if shard[0][2] is not None]
+    if not firsts:
+        raise ValueError("no tile wins the game")
+    return min(firsts)[2]
+
+
+@timer
+def find_last_winner_sharded(data: tuple, workers: int=None) -> int:
+    """Sharded version of `find_last_winner`: the last winner is the latest of
+    the last winners of the shards (the first of them, on ties).
+
+    Args:
+        data: numbers to be called during the bingo game and the tiles.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        : result of the last winner of the game.
+
+    Raises:
+        ValueError: some tile never wins the game.
+    """
+
+    lasts = [shard[1] for shard in play_shards(data, workers)]
+    if not lasts or any(points is None for _, _, points in lasts):
+        raise ValueError("some tile never wins the game")
+    return max(lasts, key=lambda last: (last[0], -last[1]))[2]
+
+
+@timer
+def rank_tiles(data: tuple, workers: int=None) -> Ranking:
+    """Finds the order in which every tile wins, sharding the tiles like
+    `find_fst_winner_sharded`. Tiles that win with the same number are ranked
+    in the order of the tiles.
+
+    Args:
+        data: numbers to be called during the bingo game and the tiles.
+        workers (optional): number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        : tiles in the order they win, with their win times and scores.
+    """
+
+    shards = play_shards(data, workers, ranking=True)
+    times = np.concatenate([shard[2] for shard in shards])
+    scores = np.concatenate([shard[3] for shard in shards])
+    order = np.argsort(times, kind="stable")
+    return Ranking(order, times[order], scores[order])
 
 
 ###############################################################################
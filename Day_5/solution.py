@@ -1,23 +1,15 @@
-import time
 import re
-from typing import Iterable
+from typing import Iterable, Iterator
 
+import numpy as np
 
-###############################################################################
+from aoc.benchmark import timer
+from aoc.stream import read_lines
 
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
 
-    Args:
-        function: function to time.
-    """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
+###############################################################################
+
+LINE_PATTERN = r"([0-9]+),([0-9]+) -> ([0-9]+),([0-9]+)"
 
 
 def read_file(filename: str) -> list:
@@ -37,13 +29,31 @@ def read_file(filename: str) -> list:
     with open(filename, 'r', encoding='utf8') as datafile:
         data = datafile.read()
     
-    return re.findall(r"([0-9]+),([0-9]+) -> ([0-9]+),([0-9]+)", data)
+    return re.findall(LINE_PATTERN, data)
+
+
+def read_stream(filename: str) -> Iterator[tuple]:
+    """Reads the lines of vents from the file one at a time. Since the lines
+    are filtered and counted lazily, `count_overlaps` and `count_overlaps_w_diag`
+    only keep the points of the graph in memory. Like `read_file`, text that
+    doesn't describe a line of vents is skipped.
+
+    Args:
+        filename: name of the file to read, or "-" for the standard input.
+
+    Returns:
+        : x1, y1, x2, y2 values of each line.
+    """
+
+    pattern = re.compile(LINE_PATTERN)
+    for line in read_lines(filename):
+        yield from pattern.findall(line)
 
 
 ###############################################################################
 # Part 1
 
-def filter_data(data: list) -> list:
+def filter_data(data: Iterable) -> Iterator:
     """Removes lines which are not horizontal or vertical and reorganizes the
     values order.
 
@@ -71,7 +81,7 @@ def filter_data(data: list) -> list:
             return (x1, x2, y2, y1)
         return (x1, x2, y1, y2)
     
-    return list(map(rearrange, filter(choose_ver_hor, data)))
+    return map(rearrange, filter(choose_ver_hor, data))
 
 
 def count_line(graph: dict, pos: tuple, overlaps: set):
@@ -150,7 +160,7 @@ def part1(test_data, data):
 
 ###############################################################################
 
-def filter_data_w_diag(data: list) -> list:
+def filter_data_w_diag(data: Iterable) -> Iterator:
     """Reorganizes the values' order.
 
     Args:
@@ -173,7 +183,7 @@ def filter_data_w_diag(data: list) -> list:
         
         return (x1, x2, y1, y2)
     
-    return list(map(rearrange, data))
+    return map(rearrange, data)
 
 
 def create_range(z1: int, z2: int) -> Iterable:
@@ -248,6 +258,121 @@ def part2(test_data, data):
     count_overlaps_w_diag(data)
 
 
+###############################################################################
+# dense grid
+
+def read_array(filename: str) -> np.ndarray:
+    """Opens a file and reads the lines of vents as an array, for the functions
+    that work on a dense grid.
+
+    Args:
+        filename: name of the file to read.
+
+    Returns:
+        : x1, y1, x2, y2 values of each line, one row per line.
+    """
+
+    return np.array(read_file(filename), dtype=np.int64).reshape(-1, 4)
+
+
+def rasterize(segments: np.ndarray, batch: int=1 << 20) -> np.ndarray:
+    """Counts how many lines pass through each point of a dense grid. The
+    points of the lines are generated at once, a batch of lines at a time, as
+    offsets from their start along their direction. Only 0, 1 and "2 or more"
+    matter, so the counts are saturated at 2 and kept in a grid of bytes, and
+    only the points of each batch are counted: with bincount when the batch has
+    about as many points as the grid has cells, and by sorting the points
+    otherwise, so sparse lines on a large grid never need a temporary array as
+    large as the grid.
+
+    Args:
+        segments: x1, y1, x2, y2 values of horizontal, vertical or diagonal
+            (at 45 degrees) lines, one row per line.
+        batch (optional): number of points generated at a time. Defaults to
+            1048576.
+
+    Returns:
+        : number of lines (up to 2) through each point, indexed by y and x.
+    """
+
+    x1, y1, x2, y2 = segments.T
+    shape = (int(max(y1.max(initial=0), y2.max(initial=0))) + 1,
+             int(max(x1.max(initial=0), x2.max(initial=0))) + 1)
+    grid = np.zeros(shape[0] * shape[1], dtype=np.uint8)
+
+    dx, dy = np.sign(x2 - x1), np.sign(y2 - y1)
+    lengths = np.maximum(np.abs(x2 - x1), np.abs(y2 - y1)) + 1
+    ends = np.cumsum(lengths)
+
+    first = 0
+    while first < len(segments):
+        last = max(int(np.searchsorted(ends, ends[first] - lengths[first]
+                                       + batch, side="right")), first + 1)
+        line = np.repeat(np.arange(first, last), lengths[first:last])
+        offset = np.arange(line.size) - np.repeat(
+            ends[first:last] - lengths[first:last] - ends[first]
+            + lengths[first], lengths[first:last])
+        points = ((y1[line] + dy[line] * offset) * shape[1]
+                  + x1[line] + dx[line] * offset)
+
+        if grid.size <= 2 * points.size:
+            counts = np.bincount(points, minlength=grid.size)
+            np.minimum(counts, 2, out=counts)
+            np.add(grid, counts, out=grid, casting="unsafe")
+        else:
+            cells, counts = np.unique(points, return_counts=True)
+            grid[cells] += np.minimum(counts, 2).astype(np.uint8)
+        np.minimum(grid, 2, out=grid)
+        first = last
+
+    return grid.reshape(shape)
+
+
+def count_crossed(grid: np.ndarray) -> int:
+    """Counts the points of a grid made by `rasterize` that have been passed by
+    at least two lines. The counts are at most 2, so the grid is halved in
+    place and its non-zero points counted, without a mask as large as the grid.
+
+    Args:
+        grid: number of lines (up to 2) through each point. It is modified.
+
+    Returns:
+        : number of points that have been passed by at least two lines.
+    """
+
+    np.right_shift(grid, 1, out=grid)
+    return int(np.count_nonzero(grid))
+
+
+@timer
+def count_overlaps_grid(segments: np.ndarray) -> int:
+    """Dense grid version of `count_overlaps`, see `rasterize`.
+
+    Args:
+        segments: x1, y1, x2, y2 values of all lines, one row per line.
+
+    Returns:
+        : number of points that have been passed by at least two lines.
+    """
+
+    x1, y1, x2, y2 = segments.T
+    straight = (x1 == x2) != (y1 == y2)
+    return count_crossed(rasterize(segments[straight]))
+
+
+@timer
+def count_overlaps_w_diag_grid(segments: np.ndarray) -> int:
+    """Dense grid version of `count_overlaps_w_diag`, see `rasterize`.
+
+    Args:
+        segments: x1, y1, x2, y2 values of all lines, one row per line.
+
+    Returns:
+        : number of points that have been passed by at least two lines.
+    """
+
+    return count_crossed(rasterize(segments))
+
 
 ###############################################################################
 
@@ -1,23 +1,9 @@
 import functools as ft
-import time
 
+from aoc.benchmark import timer
 
-###############################################################################
-
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
-
-    Args:
-        function: function to time.
-    """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
 
+###############################################################################
 
 def read_file(filename: str) -> list:
     """Opens a file and converts its data to a list.
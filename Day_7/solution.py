@@ -1,30 +1,34 @@
 import numpy as np
 import numba as nb
 import functools as ft
-import time
 import math
 
+from aoc.benchmark import timer
+
 
 ###############################################################################
 
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
+def read_file(filename: str) -> np.ndarray:
+    """Reads the horizontal positions of the crabs from the file.
 
     Args:
-        function: function to time.
+        filename: name of the file with the data.
+
+    Returns:
+        : horizontal positions of the crabs.
+
+    Requires:
+        filename must be the name of a valid file.
+        positions should be separated by commas.
     """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
+
+    return np.loadtxt(filename, delimiter=",", dtype='int64')
 
 
 ###############################################################################
+# Part 1
 
-@nb.njit()
+@nb.njit(cache=True)
 def calculated_var(h_est: int, x: int) -> int: 
     """Finds the distance between the midpoint and some other point.
 
@@ -39,7 +43,7 @@ def calculated_var(h_est: int, x: int) -> int:
 
 
 @timer
-@nb.njit()
+@nb.njit(cache=True)
 def calc_least_consumption(data: np.ndarray) -> int:
     """Finds the point closest to most points in the data and calculates the
     cumulative distance of all the points to the mid point. The value of the
@@ -156,8 +160,8 @@ def part2(test_data, data):
 ###############################################################################
 
 if __name__ == '__main__':
-    test_data = np.loadtxt("test_input.txt", delimiter=",", dtype='int64')
-    data = np.loadtxt("input.txt", delimiter=",", dtype='int64')
+    test_data = read_file("test_input.txt")
+    data = read_file("input.txt")
 
     print("Part 1 " + "-"*30)
     part1(test_data, data)
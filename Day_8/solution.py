@@ -1,21 +1,10 @@
-import time
+from typing import Iterator
 
-###############################################################################
-
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
+from aoc.benchmark import timer
+from aoc.stream import read_lines
 
-    Args:
-        function: function to time.
-    """
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
 
+###############################################################################
 
 def read_file(filename: str) -> list:
     """Reads the lines from the file.
@@ -35,6 +24,20 @@ def read_file(filename: str) -> list:
     return data
 
 
+def read_stream(filename: str) -> Iterator[str]:
+    """Reads the lines from the file one at a time.
+
+    Args:
+        filename: name of the file with the data, or "-" for the standard
+            input.
+
+    Returns:
+        : ten unique signal patterns and four digit output values per line.
+    """
+
+    return read_lines(filename)
+
+
 ###############################################################################
 # part 1
 
@@ -74,7 +77,7 @@ def total_uniq(data: list) -> int:
             letters in the four digit output values.
     """
 
-    return sum([count_uniq(line) for line in data])
+    return sum(count_uniq(line) for line in data)
 
 
 def part1(test_data: list, data: list):
@@ -199,7 +202,7 @@ def sum_decoded_output(data: list) -> int:
         sum of the decoded four digit output values.
     """
 
-    return sum([decode(line) for line in data])
+    return sum(decode(line) for line in data)
 
 
 def part2(test_data: list, data: list):
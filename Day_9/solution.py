@@ -1,26 +1,11 @@
 from tabnanny import check
-import time
 import numpy as np
 import functools as ft
 
+from aoc.benchmark import timer
 
-###############################################################################
-
-def timer(function):
-    """Times the time in miliseconds that it takes for a function to run given
-    its inputs.
-
-    Args:
-        function: function to time.
-    """
-    
-    def inner(*args):
-        start = time.time()
-        print(f"The solution is: {function(*args)}")
-        print(f"It took {(time.time()-start)*(10**3)} miliseconds to execute.")
-        print("#"*40)
-    return inner
 
+###############################################################################
 
 def read_file(filename: str) -> list:
     """Reads the map of heights from the filename.
@@ -0,0 +1,9 @@
+import sys
+
+if sys.version_info < (3, 11):
+    sys.exit("the aoc runner needs Python 3.11 or later")
+
+from aoc.cli import main
+
+
+sys.exit(main())
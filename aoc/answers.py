@@ -0,0 +1,243 @@
+"""Memoization of the answers of each part, keyed by the day, the part, the
+implementation used, the digest of the input file and the digest of the day's
+source code.
+
+    The answers are kept in a sqlite database (`answers.sqlite` in the cache
+directory of `aoc.loader`), with the time each one was last used; above
+AOC_ANSWER_CACHE_SIZE entries (4096 by default) the least recently used answers
+are evicted first. A hit only reads the database, so it doesn't depend on the
+number of answers stored: the rows it used are appended to a log next to the
+database (`answers.sqlite.log`), which is applied by the next miss (or when it
+grows above 1 MiB). The digest of the input is computed from the file before
+any function sees the data, so functions that mutate their input (like the ones
+of day 11) can't change the key of their own answer. To avoid hashing large
+inputs on every request, the digest of each file is remembered together with
+its size and modification time, with the same limit and eviction order as the
+answers.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from aoc import benchmark
+from aoc import days
+from aoc import loader
+
+
+###############################################################################
+
+ANSWERS_FILE = os.path.join(loader.CACHE_DIR, "answers.sqlite")
+MAX_ENTRIES = int(os.environ.get("AOC_ANSWER_CACHE_SIZE", 4096))
+LOG_LIMIT = 1 << 20
+
+STATS = {"hits": 0, "misses": 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY, answer TEXT NOT NULL, used INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS answers_used ON answers (used);
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime INTEGER NOT NULL,
+    digest TEXT NOT NULL, used INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS digests_used ON digests (used);
+"""
+COLUMNS = {"answers": "key", "digests": "path"}
+
+
+def connect(filename: str=None) -> sqlite3.Connection:
+    """Opens the database of answers and file digests, creating it if needed.
+
+    Args:
+        filename (optional): answers database. Defaults to ANSWERS_FILE.
+
+    Returns:
+        : connection to the database, in autocommit mode.
+    """
+
+    filename = filename or ANSWERS_FILE
+    created = not os.path.exists(filename)
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    store = sqlite3.connect(filename, timeout=30, isolation_level=None)
+    store.execute("PRAGMA synchronous=NORMAL")
+    if created:
+        store.executescript(SCHEMA)
+    return store
+
+
+def evict(store: sqlite3.Connection):
+    """Removes the least recently used answers and file digests above
+    MAX_ENTRIES.
+
+    Args:
+        store: connection to the answers database.
+    """
+
+    for table, column in COLUMNS.items():
+        store.execute(f"DELETE FROM {table} WHERE {column} NOT IN (SELECT "
+                      f"{column} FROM {table} ORDER BY used DESC LIMIT ?)",
+                      (MAX_ENTRIES,))
+
+
+def log_usage(filename: str, used: list) -> int:
+    """Appends the rows used by a request to the usage log.
+
+    Args:
+        filename: answers database.
+        used: table and key of each row used.
+
+    Returns:
+        : size of the log, in bytes.
+    """
+
+    now = time.time_ns()
+    with open(filename + ".log", 'a', encoding='utf8') as log:
+        log.writelines(f"{table}\t{now}\t{key}\n" for table, key in used)
+        return log.tell()
+
+
+def apply_usage(store: sqlite3.Connection, filename: str, used: list):
+    """Updates the time each row was last used, from the usage log and from the
+    current request, and empties the log. Updates appended by other processes
+    while the log is applied may be lost, which only changes the order of
+    eviction.
+
+    Args:
+        store: connection to the answers database.
+        filename: answers database.
+        used: table and key of each row used by the current request.
+    """
+
+    try:
+        with open(filename + ".log", 'r', encoding='utf8') as log:
+            logged = [line.rstrip("\n").split("\t", 2) for line in log]
+        os.remove(filename + ".log")
+    except OSError:
+        logged = []
+
+    now = time.time_ns()
+    rows = [(int(when), table, key) for table, when, key in logged
+            if table in COLUMNS] + [(now, table, key) for table, key in used]
+    for when, table, key in rows:
+        store.execute(f"UPDATE {table} SET used = MAX(used, ?) "
+                      f"WHERE {COLUMNS[table]} = ?", (when, key))
+
+
+def digest(store: sqlite3.Connection, filename: str, used: list) -> str:
+    """Obtains the digest of a file, hashing it only if it changed since it was
+    last hashed.
+
+    Args:
+        store: connection to the answers database.
+        filename: name of the file.
+        used: table and key of each row used, to which the digest of the file
+            is added if it was already stored.
+
+    Returns:
+        : hexadecimal sha256 digest of the content of the file.
+    """
+
+    path = os.path.abspath(filename)
+    status = os.stat(path)
+    known = store.execute("SELECT size, mtime, digest FROM digests "
+                          "WHERE path = ?", (path,)).fetchone()
+    if known is not None and known[:2] == (status.st_size, status.st_mtime_ns):
+        used.append(("digests", path))
+        return known[2]
+
+    value = loader.file_digest(path)
+    store.execute("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?)",
+                  (path, status.st_size, status.st_mtime_ns, value,
+                   time.time_ns()))
+    return value
+
+
+def answer_key(store: sqlite3.Connection, day: int, part: int, filename: str,
+               used: list, backend: str=None) -> str:
+    """Creates the key of the answer of one part of a day for an input. Besides
+    the input, the key depends on the function that solves the part and on the
+    source of the day's module, so that changing a solution doesn't return the
+    answers of its older version.
+
+    Args:
+        store: connection to the answers database.
+        day: day of the problem.
+        part: part of the problem.
+        filename: name of the input file.
+        used: table and key of each row used, see `digest`.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        : key of the answer.
+    """
+
+    spec = days.get_spec(day, part, backend)
+    source = os.path.join(days.ROOT, f"Day_{day}", "solution.py")
+    call = hashlib.sha256(repr((spec.function, spec.args)).encode())
+    return (f"day{day}-part{part}-{call.hexdigest()[:12]}-"
+            f"{digest(store, source, used)[:12]}-"
+            f"{digest(store, filename, used)[:32]}")
+
+
+###############################################################################
+
+def solve(day: int, part: int, filename: str, cache: bool=True,
+          answers_file: str=None, backend: str=None):
+    """Obtains the answer of one part of a day for an input, solving it only if
+    the answer is not stored yet. Hits and misses are counted in STATS and
+    reported with the time the request took.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        filename: name of the input file.
+        cache (optional): if true, a missing answer is solved from the cache of
+            parsed inputs when possible. Defaults to True.
+        answers_file (optional): answers database. Defaults to ANSWERS_FILE.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        : answer of the part.
+    """
+
+    start = time.perf_counter_ns()
+    answers_file = answers_file or ANSWERS_FILE
+    store = connect(answers_file)
+    try:
+        used = []
+        key = answer_key(store, day, part, filename, used, backend)
+        known = store.execute("SELECT answer FROM answers WHERE key = ?",
+                              (key,)).fetchone()
+
+        if known is not None:
+            if log_usage(answers_file, used + [("answers", key)]) > LOG_LIMIT:
+                with store:
+                    store.execute("BEGIN")
+                    apply_usage(store, answers_file, [])
+            STATS["hits"] += 1
+            answer = json.loads(known[0])
+            elapsed = (time.perf_counter_ns() - start) / 10**3
+            print(f"The solution is: {answer}")
+            print(f"Answer cache hit: it took {elapsed:.1f} microseconds.")
+            print("#"*40)
+            return answer
+
+        STATS["misses"] += 1
+        print("Answer cache miss: solving the part.")
+        data = days.read_input(day, part, filename, cache, backend)
+        answer = benchmark.to_builtin(
+            days.get_solver(day, part, backend=backend)(data))
+
+        with store:
+            store.execute("BEGIN")
+            store.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?)",
+                          (key, json.dumps(answer), time.time_ns()))
+            apply_usage(store, answers_file, used)
+            evict(store)
+        return answer
+    finally:
+        store.close()
@@ -0,0 +1,298 @@
+"""Benchmark harness shared by the solutions of every day.
+
+    The number of warmup and timed runs and the file where the measurements are
+appended as JSON lines can be set with `configure` or, for the scripts of each
+day, with the environment variables AOC_WARMUP, AOC_REPEAT and AOC_BENCH_JSON.
+"""
+
+import copy
+import functools as ft
+import json
+import math
+import os
+import statistics
+import time
+
+
+###############################################################################
+
+SETTINGS = {
+    "warmup": int(os.environ.get("AOC_WARMUP", 0)),
+    "repeat": int(os.environ.get("AOC_REPEAT", 1)),
+    "json_file": os.environ.get("AOC_BENCH_JSON") or None,
+}
+
+
+def check_runs(warmup: int, repeat: int):
+    """Checks the number of warmup and timed runs.
+
+    Args:
+        warmup: number of untimed runs.
+        repeat: number of timed runs.
+
+    Raises:
+        ValueError: warmup is negative or repeat is not positive.
+    """
+
+    if warmup < 0:
+        raise ValueError(f"the number of warmup runs can't be negative, "
+                         f"got {warmup}")
+    if repeat < 1:
+        raise ValueError(f"at least one timed run is needed, got {repeat}")
+
+
+def configure(warmup: int=None, repeat: int=None, json_file: str=None):
+    """Changes the settings used by every timed function.
+
+    Args:
+        warmup (optional): number of untimed runs before the measurements.
+        repeat (optional): number of timed runs.
+        json_file (optional): file to which each measurement is appended as a
+            JSON line.
+
+    Raises:
+        ValueError: warmup is negative or repeat is not positive.
+    """
+
+    check_runs(SETTINGS["warmup"] if warmup is None else warmup,
+               SETTINGS["repeat"] if repeat is None else repeat)
+    if warmup is not None:
+        SETTINGS["warmup"] = warmup
+    if repeat is not None:
+        SETTINGS["repeat"] = repeat
+    if json_file is not None:
+        SETTINGS["json_file"] = json_file
+
+
+def to_builtin(value):
+    """Converts numpy scalars (and containers of them) into python values, so
+    that they can be written as JSON.
+
+    Args:
+        value: value to convert.
+
+    Returns:
+        : equivalent value built only from python types.
+    """
+
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(i) for i in value]
+    if isinstance(value, dict):
+        return {key: to_builtin(val) for key, val in value.items()}
+    if hasattr(value, "item") and callable(value.item):
+        return value.item()
+    return value
+
+
+###############################################################################
+
+def percentile(sorted_samples: list, fraction: float) -> int:
+    """Finds the nearest-rank percentile of a list of samples.
+
+    Args:
+        sorted_samples: samples in ascending order.
+        fraction: percentile wanted, between 0 and 1.
+
+    Returns:
+        : smallest sample that is greater or equal than the given fraction of
+            the samples.
+    """
+
+    rank = max(math.ceil(fraction * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples: list) -> dict:
+    """Calculates the statistics of a list of time samples.
+
+    Args:
+        samples: durations in nanoseconds.
+
+    Returns:
+        : minimum, median, 95th percentile, mean and standard deviation of the
+            samples, in nanoseconds.
+    """
+
+    sorted_samples = sorted(samples)
+    return {
+        "min_ns": sorted_samples[0],
+        "median_ns": statistics.median(sorted_samples),
+        "p95_ns": percentile(sorted_samples, 0.95),
+        "mean_ns": statistics.fmean(sorted_samples),
+        "stddev_ns": statistics.pstdev(sorted_samples),
+    }
+
+
+def compile_for(function, *args, **kwargs) -> dict:
+    """Compiles a numba function for the types of the given inputs, without
+    running it, so that the compilation is not counted as execution time. With
+    `cache=True` the compiled code is loaded from the on-disk cache instead,
+    when it is available. Calls with keyword inputs are not compiled ahead.
+    Python functions that call numba functions compile the ones declared with
+    `compiles`.
+
+    Args:
+        function: function that is about to be timed.
+        args: inputs the function is going to be called with.
+        kwargs: keyword inputs the function is going to be called with.
+
+    Returns:
+        : time spent compiling (or loading from the cache) in nanoseconds and
+            whether the code came from the on-disk cache. Both are None if the
+            function is not a numba function.
+    """
+
+    if hasattr(function, "kernels"):
+        compilations = [compile_for(kernel, *inputs)
+                        for kernel, inputs in function.kernels(*args, **kwargs)]
+        if not compilations:
+            return {"compile_ns": None, "compile_cached": None}
+        return {"compile_ns": sum(i["compile_ns"] for i in compilations),
+                "compile_cached": all(i["compile_cached"]
+                                      for i in compilations)}
+
+    if not hasattr(function, "typeof_pyval") or kwargs:
+        return {"compile_ns": None, "compile_cached": None}
+
+    signature = tuple(function.typeof_pyval(arg) for arg in args)
+    defaults = function.py_func.__defaults__ or ()
+    missing = function.py_func.__code__.co_argcount - len(args)
+    if 0 < missing <= len(defaults):
+        from numba import types
+
+        signature += tuple(types.Omitted(value)
+                           for value in defaults[len(defaults) - missing:])
+    hits = sum(function.stats.cache_hits.values())
+
+    start = time.perf_counter_ns()
+    function.compile(signature)
+    elapsed = time.perf_counter_ns() - start
+
+    return {"compile_ns": elapsed,
+            "compile_cached": sum(function.stats.cache_hits.values()) > hits}
+
+
+def compiles(kernels):
+    """Declares the numba functions called by a python function, so that
+    `compile_for` compiles them before the python function is timed.
+
+    Args:
+        kernels: function that receives the inputs of the decorated function
+            and returns each numba function it calls with inputs of the types
+            it is called with.
+    """
+
+    def decorator(function):
+        function.kernels = kernels
+        return function
+    return decorator
+
+
+def measure(function, *args, warmup: int=None, repeat: int=None,
+            **kwargs) -> dict:
+    """Runs a function several times with the same inputs and measures how long
+    each run takes with `time.perf_counter_ns`.
+
+        When the function runs more than once, each run receives a deep copy of
+    the inputs, made outside the timed region, so that functions that mutate
+    their inputs (like the ones of day 11) always start from the same state.
+    Numba functions are compiled for the inputs before any run, and the time
+    that takes is reported separately.
+
+    Args:
+        function: function to time.
+        args: inputs of the function.
+        warmup (optional): number of untimed runs. Defaults to the configured
+            value.
+        repeat (optional): number of timed runs. Defaults to the configured
+            value.
+        kwargs: keyword inputs of the function.
+
+    Returns:
+        : name of the function, its result, the number of runs, the compilation
+            time, the samples and their statistics.
+
+    Raises:
+        ValueError: warmup is negative or repeat is not positive.
+    """
+
+    warmup = SETTINGS["warmup"] if warmup is None else warmup
+    repeat = SETTINGS["repeat"] if repeat is None else repeat
+    check_runs(warmup, repeat)
+    fresh = warmup + repeat > 1
+    compilation = compile_for(function, *args, **kwargs)
+
+    for _ in range(warmup):
+        call_args, call_kwargs = (copy.deepcopy((args, kwargs)) if fresh
+                                  else (args, kwargs))
+        function(*call_args, **call_kwargs)
+
+    samples = []
+    for _ in range(repeat):
+        call_args, call_kwargs = (copy.deepcopy((args, kwargs)) if fresh
+                                  else (args, kwargs))
+        start = time.perf_counter_ns()
+        result = function(*call_args, **call_kwargs)
+        samples.append(time.perf_counter_ns() - start)
+
+    return {
+        "function": f"{function.__module__}.{function.__name__}",
+        "result": result,
+        "warmup": warmup,
+        "repeat": repeat,
+        "samples_ns": samples,
+        **compilation,
+        **summarize(samples),
+    }
+
+
+def write_json(record: dict, filename: str):
+    """Appends a measurement to a file of JSON lines.
+
+    Args:
+        record: measurement obtained from `measure`.
+        filename: name of the file to append the measurement to.
+    """
+
+    with open(filename, 'a', encoding='utf8') as jsonfile:
+        jsonfile.write(json.dumps(to_builtin(record)) + "\n")
+
+
+def report(record: dict):
+    """Prints the result of a measurement and, if configured, stores it.
+
+    Args:
+        record: measurement obtained from `measure`.
+    """
+
+    print(f"The solution is: {record['result']}")
+    if record["compile_ns"] is not None:
+        source = "loaded from cache" if record["compile_cached"] else "compiled"
+        print(f"Compilation took {record['compile_ns'] / 10**6} miliseconds "
+              f"({source}).")
+    print(f"It took {record['median_ns'] / 10**6} miliseconds to execute.")
+    if record["repeat"] > 1:
+        print(f"min {record['min_ns'] / 10**6:.3f} ms | "
+              f"p95 {record['p95_ns'] / 10**6:.3f} ms | "
+              f"stddev {record['stddev_ns'] / 10**6:.3f} ms | "
+              f"{record['repeat']} runs, {record['warmup']} warmup")
+    print("#"*40)
+
+    if SETTINGS["json_file"]:
+        write_json(record, SETTINGS["json_file"])
+
+
+def timer(function):
+    """Times the time in miliseconds that it takes for a function to run given
+    its inputs, using the configured number of warmup and timed runs.
+
+    Args:
+        function: function to time.
+    """
+
+    @ft.wraps(function)
+    def inner(*args, **kwargs):
+        record = measure(function, *args, **kwargs)
+        report(record)
+        return record["result"]
+    return inner
@@ -0,0 +1,445 @@
+"""Command line runner of the solutions.
+
+Usage:
+    python -m aoc run --day 9 --part 2 --input path/to/input.txt
+    python -m aoc run --day 5 --part 2 --profile cpu --profile-out /tmp/day5
+    python -m aoc run --day 12 --memo
+    python -m aoc run --day 1 --backend memmap --input depths.txt
+    cat huge.txt | python -m aoc run --day 1 --stream --input -
+    python -m aoc run-all --workers 8
+    python -m aoc bench --repeat 10 --threshold 0.15
+    python -m aoc generate --day 5 --size 100000 --width 5000 --output vents.txt
+    python -m aoc compare --day 3 --part 2 --size 1000000 --width 32
+"""
+
+import argparse
+import sys
+import time
+
+from aoc import benchmark
+from aoc import days
+
+
+###############################################################################
+
+def run(args: argparse.Namespace):
+    """Solves the requested parts of a day, printing the answers and the
+    time it took to obtain them.
+
+    Args:
+        args: parsed command line arguments of the `run` command.
+    """
+
+    filename = args.input or days.default_input(args.day, args.test)
+    parts = [args.part] if args.part else sorted(days.DAYS[args.day])
+    try:
+        for part in parts:
+            days.get_spec(args.day, part, args.backend)
+    except ValueError as error:
+        raise SystemExit(str(error))
+
+    if args.stream:
+        return run_stream(args.day, parts, filename)
+    if filename == "-":
+        raise SystemExit("the standard input can only be read with --stream")
+    if args.memo and not args.profile:
+        return run_memo(args.day, parts, filename, args.cache, args.backend)
+
+    for part in parts:
+        print(f"Day {args.day} part {part} " + "-"*30)
+        data = days.read_input(args.day, part, filename, args.cache,
+                               args.backend)
+
+        if args.profile:
+            from aoc import profiling
+
+            function, extra = days.get_function(args.day, part, False,
+                                                args.backend)
+            prefix = f"{args.profile_out}-day{args.day}-part{part}"
+            print(profiling.profile(args.profile, function, (data, *extra),
+                                    prefix, args.top))
+        else:
+            days.get_solver(args.day, part, backend=args.backend)(data)
+
+
+def run_memo(day: int, parts: list, filename: str, cache: bool,
+             backend: str=None):
+    """Obtains the answers of the requested parts of a day from the answer
+    cache, solving only the ones that are not cached yet.
+
+    Args:
+        day: day of the problem.
+        parts: parts to solve.
+        filename: name of the input file.
+        cache: if true, missing answers are solved from the cache of parsed
+            inputs when possible.
+        backend (optional): name of an alternative implementation of the
+            parts. Defaults to the main implementation.
+    """
+
+    from aoc import answers
+
+    for part in parts:
+        print(f"Day {day} part {part} " + "-"*30)
+        answers.solve(day, part, filename, cache, backend=backend)
+    print(f"Answer cache: {answers.STATS['hits']} hits, "
+          f"{answers.STATS['misses']} misses")
+
+
+def run_stream(day: int, parts: list, filename: str):
+    """Solves the requested parts of a day reading the input one line at a
+    time, so that inputs larger than the memory (or piped through the standard
+    input) can be solved. Each part runs once: a stream can't be replayed.
+
+    Args:
+        day: day of the problem.
+        parts: parts to solve.
+        filename: name of the input file, or "-" for the standard input.
+    """
+
+    functions = [days.get_stream_function(day, part, timed=False)
+                 for part in parts]
+    if None in functions:
+        raise SystemExit(f"day {day} can't be solved from a stream")
+    if filename == "-" and len(parts) > 1:
+        raise SystemExit("only one part can be solved from the standard input")
+
+    for part, function in zip(parts, functions):
+        print(f"Day {day} part {part} " + "-"*30)
+        lines = days.read_stream(day, filename)
+        benchmark.report(benchmark.measure(function, lines, warmup=0,
+                                           repeat=1))
+
+
+def run_all(args: argparse.Namespace) -> int:
+    """Solves every selected day and part concurrently and prints a report
+    with the answers, timings and peak memory of each job.
+
+    Args:
+        args: parsed command line arguments of the `run-all` command.
+
+    Returns:
+        : 1 if any job failed, 0 otherwise.
+    """
+
+    from aoc import runner
+
+    jobs = runner.create_jobs(args.days, [args.part] if args.part else None,
+                              args.test)
+
+    start = time.perf_counter_ns()
+    records = runner.run_all(jobs, args.workers, cache=args.cache)
+    print(runner.format_report(records, time.perf_counter_ns() - start))
+
+    if benchmark.SETTINGS["json_file"]:
+        for record in records:
+            benchmark.write_json(record, benchmark.SETTINGS["json_file"])
+
+    return int(any("error" in record for record in records))
+
+
+def bench(args: argparse.Namespace) -> int:
+    """Runs the benchmark suite, appends the results to the history and
+    compares them with the stored baseline. If there is no baseline yet, or if
+    requested, the results become the new baseline.
+
+    Args:
+        args: parsed command line arguments of the `bench` command.
+
+    Returns:
+        : 1 if any function got slower than the threshold, failed or changed
+            its answer, 0 otherwise.
+    """
+
+    from aoc import regression
+    from aoc import runner
+
+    jobs = runner.create_jobs(args.days, [args.part] if args.part else None,
+                              args.test)
+    records = runner.run_all(jobs, args.workers,
+                             1 if args.warmup is None else args.warmup,
+                             5 if args.repeat is None else args.repeat,
+                             args.cache)
+
+    results = regression.summarize_records(records)
+    entry = regression.append_history(results, args.history)
+    baseline = regression.load_baseline(args.baseline)
+
+    if baseline is None or args.save_baseline:
+        regression.save_baseline(entry, args.baseline)
+        print(f"Saved the results of {entry['commit']} as the baseline.")
+        if baseline is None:
+            return int(any("error" in result for result in results.values()))
+
+    rows = regression.compare(baseline["results"], results, args.threshold,
+                              args.min_delta * 10**6)
+    print(f"Baseline: {baseline['commit']}  Current: {entry['commit']}")
+    print(regression.format_comparison(rows))
+    return int(regression.regressed(rows))
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Benchmarks every backend of a part against each other, on the given
+    input or on a synthetic one generated for the comparison.
+
+    Args:
+        args: parsed command line arguments of the `compare` command.
+
+    Returns:
+        : 1 if any backend failed or gave a different answer, 0 otherwise.
+    """
+
+    import glob
+    import os
+    import tempfile
+
+    from aoc import runner
+    from aoc.generate import write_input
+
+    filename = args.input
+    if filename is None:
+        handle, filename = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+        write_input(args.day, filename, args.size, args.width, args.seed)
+
+    try:
+        # a synthetic input is never read again, so caching its parsed copies
+        # would only fill the cache
+        records = runner.compare_backends(
+            args.day, args.part, filename,
+            1 if args.warmup is None else args.warmup,
+            5 if args.repeat is None else args.repeat,
+            args.cache and args.input is not None)
+    finally:
+        if args.input is None:
+            # also removes the files derived from the input, like the binary
+            # file of the memmap backend of day 1
+            for leftover in glob.glob(glob.escape(filename) + "*"):
+                os.remove(leftover)
+
+    print(runner.format_backends(records))
+    if benchmark.SETTINGS["json_file"]:
+        for record in records:
+            benchmark.write_json(record, benchmark.SETTINGS["json_file"])
+
+    answers = {str(record.get("result")) for record in records}
+    return int(len(answers) > 1 or any("error" in record for record in records))
+
+
+def generate(args: argparse.Namespace):
+    """Writes a synthetic input of a day.
+
+    Args:
+        args: parsed command line arguments of the `generate` command.
+    """
+
+    from aoc.generate import write_input
+
+    options = {}
+    if args.board:
+        if args.day != 4:
+            raise SystemExit("--board only applies to day 4")
+        options["board"] = args.board
+    write_input(args.day, args.output, args.size, args.width, args.seed,
+                **options)
+
+
+###############################################################################
+
+def add_benchmark_arguments(parser: argparse.ArgumentParser):
+    """Adds the options that control the benchmark harness and the cache of
+    parsed inputs to a command.
+
+    Args:
+        parser: parser of the command.
+    """
+
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="always parse the input, ignoring the cache of "
+                             "parsed inputs")
+
+    parser.add_argument("--warmup", type=count_type(0),
+                        help="untimed runs per part")
+    parser.add_argument("--repeat", type=count_type(1),
+                        help="timed runs per part")
+    parser.add_argument("--json", dest="json_file",
+                        help="append the measurements to this JSON lines file")
+
+
+def count_type(minimum: int):
+    """Creates an argument type for integers of at least a minimum value.
+
+    Args:
+        minimum: smallest valid value.
+
+    Returns:
+        : function that parses the argument.
+    """
+
+    def parse(text: str) -> int:
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, "
+                                             f"got {value}")
+        return value
+    return parse
+
+
+def board_shape(text: str) -> tuple:
+    """Parses a board shape, like "5x5".
+
+    Args:
+        text: number of lines and columns separated by an "x".
+
+    Returns:
+        : number of lines and number of columns.
+    """
+
+    try:
+        lines, cols = map(int, text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid board shape: {text!r}")
+    if lines < 1 or cols < 1:
+        raise argparse.ArgumentTypeError(f"invalid board shape: {text!r}")
+    return lines, cols
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the parser of the command line arguments.
+
+    Returns:
+        parser: parser with one sub-command per action of the runner.
+    """
+
+    parser = argparse.ArgumentParser(prog="aoc", description=__doc__,
+                            formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="solve a day")
+    run_parser.add_argument("--day", type=int, required=True,
+                            choices=sorted(days.DAYS))
+    run_parser.add_argument("--part", type=int, choices=(1, 2),
+                            help="part to solve (default: both)")
+    run_parser.add_argument("--input",
+                            help="input file, or - for the standard input "
+                                 "with --stream (default: the day's "
+                                 "input.txt)")
+    run_parser.add_argument("--test", action="store_true",
+                            help="use the day's test_input.txt")
+    run_parser.add_argument("--backend",
+                            help="alternative implementation of the parts "
+                                 "(e.g. memmap for day 1)")
+    run_parser.add_argument("--stream", action="store_true",
+                            help="read the input one line at a time (days 1, "
+                                 "2, 3, 5, 8 and 10)")
+    run_parser.add_argument("--memo", action="store_true",
+                            help="return the stored answer when the input and "
+                                 "the solution didn't change")
+    run_parser.add_argument("--profile", choices=("cpu", "mem"),
+                            help="profile the part instead of timing it")
+    run_parser.add_argument("--profile-out", default="profile",
+                            help="path prefix of the CPU profile files "
+                                 "(default: profile)")
+    run_parser.add_argument("--top", type=int, default=20,
+                            help="entries listed by the profile report")
+    add_benchmark_arguments(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    all_parser = commands.add_parser("run-all",
+                                     help="solve many days on a process pool")
+    all_parser.add_argument("--days", type=int, nargs="+",
+                            choices=sorted(days.DAYS),
+                            help="days to solve (default: all)")
+    all_parser.add_argument("--part", type=int, choices=(1, 2),
+                            help="part to solve (default: both)")
+    all_parser.add_argument("--test", action="store_true",
+                            help="use the test inputs")
+    all_parser.add_argument("--workers", type=int,
+                            help="worker processes (default: number of CPUs)")
+    add_benchmark_arguments(all_parser)
+    all_parser.set_defaults(handler=run_all)
+
+    bench_parser = commands.add_parser("bench",
+                            help="benchmark and compare against a baseline")
+    bench_parser.add_argument("--days", type=int, nargs="+",
+                              choices=sorted(days.DAYS),
+                              help="days to benchmark (default: all)")
+    bench_parser.add_argument("--part", type=int, choices=(1, 2),
+                              help="part to benchmark (default: both)")
+    bench_parser.add_argument("--test", action="store_true",
+                              help="use the test inputs")
+    bench_parser.add_argument("--workers", type=int, default=1,
+                              help="worker processes (default: 1, so that jobs "
+                                   "don't compete for the CPU)")
+    bench_parser.add_argument("--threshold", type=float, default=0.1,
+                              help="relative slowdown that fails the run "
+                                   "(default: 0.1)")
+    bench_parser.add_argument("--min-delta", type=float, default=0.05,
+                              help="slowdowns under this many miliseconds are "
+                                   "ignored (default: 0.05)")
+    bench_parser.add_argument("--history", default=None,
+                              help="JSON lines history file")
+    bench_parser.add_argument("--baseline", default=None,
+                              help="baseline file")
+    bench_parser.add_argument("--save-baseline", action="store_true",
+                              help="store this run as the new baseline")
+    add_benchmark_arguments(bench_parser)
+    bench_parser.set_defaults(handler=bench)
+
+    compare_parser = commands.add_parser("compare",
+                            help="benchmark the backends of a part")
+    compare_parser.add_argument("--day", type=int, required=True,
+                                choices=sorted(days.DAYS))
+    compare_parser.add_argument("--part", type=int, required=True,
+                                choices=(1, 2))
+    compare_parser.add_argument("--input",
+                                help="input file (default: a synthetic input)")
+    compare_parser.add_argument("--size", type=int, default=100000,
+                                help="main size of the synthetic input "
+                                     "(default: 100000)")
+    compare_parser.add_argument("--width", type=int,
+                                help="second dimension of the synthetic input")
+    compare_parser.add_argument("--seed", type=int, default=0)
+    add_benchmark_arguments(compare_parser)
+    compare_parser.set_defaults(handler=compare)
+
+    gen_parser = commands.add_parser("generate", help="write a synthetic input")
+    gen_parser.add_argument("--day", type=int, required=True,
+                            choices=sorted(days.DAYS))
+    gen_parser.add_argument("--size", type=int, required=True,
+                            help="lines, boards, segments, caves, ... to write")
+    gen_parser.add_argument("--width", type=int,
+                            help="second dimension (bits, columns, "
+                                 "coordinate range, ...)")
+    gen_parser.add_argument("--seed", type=int, default=0)
+    gen_parser.add_argument("--board", type=board_shape,
+                            help="lines x columns of the day 4 boards "
+                                 "(default: 5x5)")
+    gen_parser.add_argument("--output", required=True)
+    gen_parser.set_defaults(handler=generate)
+
+    return parser
+
+
+def main(argv: list=None) -> int:
+    """Entry point of the runner.
+
+    Args:
+        argv (optional): command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        : exit status of the command.
+    """
+
+    args = build_parser().parse_args(argv)
+    benchmark.configure(getattr(args, "warmup", None),
+                        getattr(args, "repeat", None),
+                        getattr(args, "json_file", None))
+    return args.handler(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Registry of the solutions of each day.
+
+    The modules of the days are only imported when one of their parts is
+requested, so running a pure python day doesn't pay for the imports (numpy,
+numba) of the others.
+"""
+
+import importlib
+import os
+from typing import NamedTuple
+
+
+###############################################################################
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Part(NamedTuple):
+    """How to solve one part of a day: the timed function of the day's module
+    that solves it, the extra arguments it takes after the data and the
+    function of the module that reads the input file. Parts that can also be
+    solved one line at a time name the function that does it in `stream`; it
+    receives the iterator returned by the module's `read_stream`.
+
+        Alternative implementations of a part are listed in `backends`, by
+    name, each one described by its own Part. Readers whose result must not be
+    stored in the cache of parsed inputs (because it refers to other files, for
+    example) set `cache` to false.
+    """
+
+    function: str
+    args: tuple = ()
+    reader: str = "read_file"
+    stream: str = None
+    backends: dict = None
+    cache: bool = True
+
+
+DAYS = {
+    1: {1: Part("count_increases", stream="count_increases_stream",
+                backends={"memmap": Part("count_increases_memmap",
+                                         reader="read_binary", cache=False),
+                          "parallel": Part("count_increases_parallel"),
+                          "window": Part("count_window_increases", (1,))}),
+        2: Part("count_3_increases", stream="count_3_increases_stream",
+                backends={"memmap": Part("count_3_increases_memmap",
+                                         reader="read_binary", cache=False),
+                          "parallel": Part("count_3_increases_parallel"),
+                          "window": Part("count_window_increases", (3,))})},
+    2: {1: Part("calculate_coor", stream="calculate_coor_stream",
+                backends={"parallel": Part("calculate_coor_parallel",
+                                           reader="read_path", cache=False)}),
+        2: Part("calculate_coor_w_aim", stream="calculate_coor_w_aim_stream",
+                backends={"parallel": Part("calculate_coor_w_aim_parallel",
+                                           reader="read_path", cache=False)})},
+    3: {1: Part("determ_gamma_epsilon", stream="determ_gamma_epsilon_stream"),
+        2: Part("obtain_ox_diox_gen", stream="obtain_ox_diox_gen_stream",
+                backends={"sort": Part("obtain_ox_diox_gen_sorted")})},
+    4: {1: Part("find_fst_winner", backends={
+            "incremental": Part("find_fst_winner_incremental"),
+            "sharded": Part("find_fst_winner_sharded")}),
+        2: Part("find_last_winner", backends={
+            "incremental": Part("find_last_winner_incremental"),
+            "sharded": Part("find_last_winner_sharded")})},
+    5: {1: Part("count_overlaps", stream="count_overlaps",
+                backends={"grid": Part("count_overlaps_grid",
+                                       reader="read_array")}),
+        2: Part("count_overlaps_w_diag", stream="count_overlaps_w_diag",
+                backends={"grid": Part("count_overlaps_w_diag_grid",
+                                       reader="read_array")})},
+    6: {1: Part("generations", (80,)), 2: Part("generations", (256,))},
+    7: {1: Part("calc_least_consumption"), 2: Part("find_cost_midpoint")},
+    8: {1: Part("total_uniq", stream="total_uniq"),
+        2: Part("sum_decoded_output", stream="sum_decoded_output")},
+    9: {1: Part("time_find_lows"), 2: Part("get_basins")},
+    10: {1: Part("get_incorrect_score", stream="get_incorrect_score"),
+         2: Part("get_correct_score", stream="get_correct_score")},
+    11: {1: Part("count_flashes", (100,)), 2: Part("find_sim_flash")},
+    12: {1: Part("count_paths"), 2: Part("count_mul_paths")},
+}
+
+
+def load_day(day: int):
+    """Imports the module with the solution of a day.
+
+    Args:
+        day: day of the problem.
+
+    Returns:
+        : module `Day_<day>.solution`.
+
+    Requires:
+        day must be one of the days in DAYS.
+    """
+
+    return importlib.import_module(f"Day_{day}.solution")
+
+
+def default_input(day: int, test: bool=False) -> str:
+    """Finds the path of the input shipped with a day.
+
+    Args:
+        day: day of the problem.
+        test (optional): if true, returns the path of the small test input
+            instead of the puzzle input. Defaults to False.
+
+    Returns:
+        : path of the input file.
+    """
+
+    return os.path.join(ROOT, f"Day_{day}",
+                        "test_input.txt" if test else "input.txt")
+
+
+def get_spec(day: int, part: int, backend: str=None) -> Part:
+    """Obtains the description of how to solve one part of a day.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        : description of the part, or of the backend.
+
+    Raises:
+        ValueError: the part has no backend with that name.
+    """
+
+    spec = DAYS[day][part]
+    if backend is None:
+        return spec
+    if not spec.backends or backend not in spec.backends:
+        raise ValueError(f"day {day} part {part} has no backend {backend!r} "
+                         f"(available: {sorted(spec.backends or ())})")
+    return spec.backends[backend]
+
+
+def read_input(day: int, part: int, filename: str, cache: bool=False,
+               backend: str=None):
+    """Reads an input file with the reader used by one part of a day.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        filename: name of the input file.
+        cache (optional): if true, the parsed input is loaded from (or stored
+            in) the cache of parsed inputs, see `aoc.loader`. Defaults to False.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        : parsed input, as expected by the function that solves the part.
+    """
+
+    spec = get_spec(day, part, backend)
+    if cache and spec.cache:
+        from aoc import loader
+        return loader.read_input(day, part, filename, backend)
+
+    return getattr(load_day(day), spec.reader)(filename)
+
+
+def get_function(day: int, part: int, timed: bool=True,
+                 backend: str=None) -> tuple:
+    """Obtains the function that solves one part of a day and the arguments it
+    takes after the data.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        timed (optional): if false, the function is unwrapped from its timer,
+            so calling it neither prints nor measures anything. Defaults to
+            True.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        function: function of the day's module that solves the part.
+        args: extra arguments of the function.
+    """
+
+    spec = get_spec(day, part, backend)
+    function = getattr(load_day(day), spec.function)
+    if not timed:
+        function = getattr(function, "__wrapped__", function)
+    return function, spec.args
+
+
+def get_stream_function(day: int, part: int, timed: bool=True):
+    """Obtains the function that solves one part of a day from a stream of
+    lines.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        timed (optional): if false, the function is unwrapped from its timer.
+            Defaults to True.
+
+    Returns:
+        : function of the day's module that solves the part, or None if the
+            part can't be solved from a stream.
+    """
+
+    spec = DAYS[day][part]
+    if spec.stream is None:
+        return None
+
+    function = getattr(load_day(day), spec.stream)
+    if not timed:
+        function = getattr(function, "__wrapped__", function)
+    return function
+
+
+def read_stream(day: int, filename: str):
+    """Reads an input file lazily, with the `read_stream` function of a day.
+
+    Args:
+        day: day of the problem.
+        filename: name of the input file, or "-" for the standard input.
+
+    Returns:
+        : iterator over the parsed lines of the input.
+    """
+
+    return load_day(day).read_stream(filename)
+
+
+def get_solver(day: int, part: int, timed: bool=True, backend: str=None):
+    """Obtains a function that solves one part of a day.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        timed (optional): if false, the function is unwrapped from its timer.
+            Defaults to True.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        : function that receives the parsed input and returns the answer.
+    """
+
+    function, args = get_function(day, part, timed, backend)
+
+    def solver(data):
+        return function(data, *args)
+    return solver
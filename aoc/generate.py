@@ -0,0 +1,315 @@
+"""Generators of synthetic inputs for every day, at any size.
+
+    Each generator receives a seeded `random.Random`, the main size of the input
+(number of lines, boards, segments, vertices, ...) and, when it makes sense, a
+second dimension (width), and yields the text of the input in pieces, so that
+inputs larger than the memory can be written. The same seed always produces
+the same input.
+"""
+
+import random
+import string
+from typing import Iterator
+
+
+###############################################################################
+
+def sonar_depths(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 1: `size` depth measurements following a random walk.
+    """
+
+    depth = rng.randint(100, 200)
+    for _ in range(size):
+        depth = max(0, depth + rng.randint(-20, 30))
+        yield f"{depth}\n"
+
+
+def course(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 2: `size` commands with values between 1 and `width` (default 9).
+    """
+
+    directions = ("forward", "down", "up")
+    for _ in range(size):
+        direction = rng.choices(directions, weights=(5, 3, 2))[0]
+        yield f"{direction} {rng.randint(1, width or 9)}\n"
+
+
+def diagnostic_report(rng: random.Random, size: int,
+                        width: int) -> Iterator[str]:
+    """Day 3: `size` binary numbers with `width` bits (default 12).
+    """
+
+    width = width or 12
+    for _ in range(size):
+        yield format(rng.getrandbits(width), f"0{width}b") + "\n"
+
+
+def bingo(rng: random.Random, size: int, width: int,
+          board: tuple=(5, 5)) -> Iterator[str]:
+    """Day 4: `size` boards of `board` lines and columns (default 5x5) with
+    numbers taken from range(width) (default 100, or the number of cells of a
+    board if it is larger). Every number of the range is drawn, so every board
+    wins.
+    """
+
+    lines, cols = board
+    pool = max(width or 100, lines * cols)
+    draws = list(range(pool))
+    rng.shuffle(draws)
+    yield ",".join(map(str, draws)) + "\n"
+
+    for _ in range(size):
+        numbers = rng.sample(range(pool), lines * cols)
+        yield "\n"
+        for line in range(lines):
+            yield " ".join(f"{num:2d}"
+                           for num in numbers[cols*line:cols*line + cols])
+            yield "\n"
+
+
+def vent_lines(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 5: `size` horizontal, vertical or diagonal segments with coordinates
+    in range(width) (default 1000).
+    """
+
+    width = max(width or 1000, 2)
+    for _ in range(size):
+        x1, y1 = rng.randrange(width), rng.randrange(width)
+        kind = rng.randrange(3)
+
+        if kind == 2:
+            sx, sy = rng.choice((-1, 1)), rng.choice((-1, 1))
+            room = min(width - 1 - x1 if sx > 0 else x1,
+                       width - 1 - y1 if sy > 0 else y1)
+            if room > 0:
+                length = rng.randint(1, room)
+                yield f"{x1},{y1} -> {x1 + sx*length},{y1 + sy*length}\n"
+                continue
+            kind = rng.randrange(2)
+
+        fixed = x1 if kind == 0 else y1
+        other = rng.randrange(width - 1)
+        other += other >= fixed
+        if kind == 0:
+            yield f"{x1},{y1} -> {other},{y1}\n"
+        else:
+            yield f"{x1},{y1} -> {x1},{other}\n"
+
+
+def lanternfish(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 6: `size` timers between 1 and 5, separated by commas.
+    """
+
+    for index in range(size):
+        yield ("," if index else "") + str(rng.randint(1, 5))
+    yield "\n"
+
+
+def crabs(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 7: `size` horizontal positions in range(width) (default 2000),
+    separated by commas.
+    """
+
+    for index in range(size):
+        yield ("," if index else "") + str(rng.randrange(width or 2000))
+    yield "\n"
+
+
+DIGIT_SEGMENTS = ("abcefg", "cf", "acdeg", "acdfg", "bcdf", "abdfg", "abdefg",
+                  "acf", "abcdefg", "abcdfg")
+
+
+def seven_segments(rng: random.Random, size: int,
+                    width: int) -> Iterator[str]:
+    """Day 8: `size` entries, each with its own random wiring of the segments.
+    """
+
+    for _ in range(size):
+        wires = list("abcdefg")
+        rng.shuffle(wires)
+        wiring = dict(zip("abcdefg", wires))
+
+        def encode(digit: int) -> str:
+            letters = [wiring[segment] for segment in DIGIT_SEGMENTS[digit]]
+            rng.shuffle(letters)
+            return "".join(letters)
+
+        patterns = [encode(digit) for digit in range(10)]
+        rng.shuffle(patterns)
+        output = [encode(rng.randrange(10)) for _ in range(4)]
+        yield " ".join(patterns) + " | " + " ".join(output) + "\n"
+
+
+def heightmap(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 9: `size` x `width` (default `size`) heightmap. Basins are enclosed
+    by rows and columns of 9s at random intervals, which keeps each basin under
+    12x12 locations, so the recursion of `expand_basin` stays bounded.
+    """
+
+    width = width or size
+
+    def walls(length: int) -> set:
+        positions = set()
+        position = rng.randint(3, 12)
+        while position < length:
+            positions.add(position)
+            position += rng.randint(3, 12)
+        return positions
+
+    wall_cols = walls(width)
+    next_wall_row = rng.randint(3, 12)
+    for line in range(size):
+        if line == next_wall_row:
+            next_wall_row += rng.randint(3, 12)
+            yield "9" * width + "\n"
+            continue
+        yield "".join("9" if col in wall_cols else str(rng.randrange(9))
+                      for col in range(width)) + "\n"
+
+
+def navigation(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 10: `size` lines of about `width` (default 100) braces. Lines are
+    either corrupted or incomplete, and the number of incomplete lines is odd,
+    so that the median score of part 2 exists.
+    """
+
+    pairs = {'(': ')', '[': ']', '{': '}', '<': '>'}
+    openers = list(pairs)
+    length = max(width or 100, 2)
+    incomplete = 0
+
+    for index in range(size):
+        corrupt = rng.random() < 0.5
+        if index == size - 1:
+            corrupt = incomplete % 2 == 1
+        incomplete += not corrupt
+
+        stack, line = [], []
+        for _ in range(rng.randint(1, length - 1)):
+            if stack and rng.random() < 0.45:
+                line.append(pairs[stack.pop()])
+            else:
+                stack.append(rng.choice(openers))
+                line.append(stack[-1])
+
+        if not stack:
+            stack.append(rng.choice(openers))
+            line.append(stack[-1])
+        if corrupt:
+            line.append(rng.choice([i for i in pairs.values()
+                                    if i != pairs[stack[-1]]]))
+        yield "".join(line) + "\n"
+
+
+def octopuses(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 11: `size` x `width` (default `size`) grid of energy levels. There is
+    no guarantee that a random grid ever flashes all at once, so part 2 may not
+    end on large grids.
+    """
+
+    for _ in range(size):
+        yield "".join(str(rng.randrange(10)) for _ in range(width or size))
+        yield "\n"
+
+
+def cave_names(count: int, upper: bool) -> Iterator[str]:
+    """Generates `count` distinct cave names, never "start" or "end".
+    """
+
+    letters = string.ascii_uppercase if upper else string.ascii_lowercase
+    index = 0
+    while count > 0:
+        name, value = "", index
+        while True:
+            name = letters[value % 26] + name
+            value = value // 26 - 1
+            if value < 0:
+                break
+        index += 1
+        if name not in ("start", "end"):
+            count -= 1
+            yield name
+
+
+def caves(rng: random.Random, size: int, width: int) -> Iterator[str]:
+    """Day 12: cave system with `size` caves besides start and end, of which
+    about a quarter are big. Big caves are never connected to each other, so
+    the number of paths is finite, but it grows exponentially with `size`.
+    """
+
+    n_big = size // 4
+    big = list(cave_names(n_big, True))
+    small = list(cave_names(size - n_big, False))
+    vertices = big + small
+    rng.shuffle(vertices)
+
+    edges = set()
+    for vert in rng.sample(vertices, min(2, len(vertices))):
+        edges.add(("start", vert))
+    for vert in rng.sample(vertices, min(2, len(vertices))):
+        edges.add((vert, "end"))
+
+    big_caves = set(big)
+    for vert in vertices:
+        options = [i for i in small if i != vert] if vert in big_caves else \
+                  [i for i in vertices if i != vert]
+        for other in rng.sample(options, min(2, len(options))):
+            if (other, vert) not in edges:
+                edges.add((vert, other))
+
+    for vert1, vert2 in sorted(edges):
+        yield f"{vert1}-{vert2}\n"
+
+
+###############################################################################
+
+GENERATORS = {
+    1: sonar_depths,
+    2: course,
+    3: diagnostic_report,
+    4: bingo,
+    5: vent_lines,
+    6: lanternfish,
+    7: crabs,
+    8: seven_segments,
+    9: heightmap,
+    10: navigation,
+    11: octopuses,
+    12: caves,
+}
+
+
+def generate(day: int, size: int, width: int=None, seed: int=0,
+             **options) -> Iterator[str]:
+    """Generates the text of a synthetic input of a day.
+
+    Args:
+        day: day of the problem.
+        size: main size of the input (lines, boards, segments, caves, ...).
+        width (optional): second dimension of the input, when the day has one.
+            Defaults to the value each generator documents.
+        seed (optional): seed of the random number generator. Defaults to 0.
+        options: other options of the day's generator (`board` for day 4).
+
+    Returns:
+        : pieces of the text of the input.
+    """
+
+    return GENERATORS[day](random.Random(seed), size, width, **options)
+
+
+def write_input(day: int, filename: str, size: int, width: int=None,
+                seed: int=0, **options):
+    """Writes a synthetic input of a day to a file.
+
+    Args:
+        day: day of the problem.
+        filename: name of the file to write.
+        size: main size of the input.
+        width (optional): second dimension of the input.
+        seed (optional): seed of the random number generator. Defaults to 0.
+        options: other options of the day's generator.
+    """
+
+    with open(filename, 'w', encoding='utf8') as datafile:
+        datafile.writelines(generate(day, size, width, seed, **options))
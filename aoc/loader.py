@@ -0,0 +1,257 @@
+"""Cache of parsed inputs, keyed by the hash of the input file's content.
+
+    The first time an input is read by a day's reader, the parsed value is
+stored in the cache directory (AOC_CACHE_DIR, `.aoc_cache` at the root of the
+repository by default). Numpy arrays are stored as `.npy` files and loaded back
+memory-mapped in copy-on-write mode, so solutions that mutate their input (like
+day 11) still work and never change the cache. Named tuples are rebuilt with
+their own class. Everything else (lists, strings, numbers) is stored with
+`marshal`, which doesn't need numpy to be loaded. Inputs that can't be stored
+that way are simply not cached.
+
+    The cache holds at most AOC_CACHE_MAX_MB megabytes of parsed inputs (1024 by
+default). Every time an input is stored, the least recently used ones are
+removed until the cache fits.
+"""
+
+import functools as ft
+import hashlib
+import importlib
+import marshal
+import os
+import sys
+
+from aoc import days
+
+
+###############################################################################
+
+CACHE_DIR = os.environ.get("AOC_CACHE_DIR",
+                           os.path.join(days.ROOT, ".aoc_cache"))
+MAX_BYTES = int(os.environ.get("AOC_CACHE_MAX_MB", 1024)) * 1024**2
+
+
+def file_digest(filename: str) -> str:
+    """Hashes the content of a file.
+
+    Args:
+        filename: name of the file.
+
+    Returns:
+        : hexadecimal sha256 digest of the content of the file.
+    """
+
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as datafile:
+        for block in iter(lambda: datafile.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(day: int, reader, filename: str) -> str:
+    """Creates the key of a parsed input. Besides the content of the input, the
+    key depends on the name of the reader and on the source of its module, so
+    that changing a reader, or any helper or constant it uses, doesn't load
+    values parsed by its older version.
+
+    Args:
+        day: day of the problem.
+        reader: function that parses the input.
+        filename: name of the input file.
+
+    Returns:
+        : key of the parsed input.
+    """
+
+    source = file_digest(sys.modules[reader.__module__].__file__)[:12]
+    return f"day{day}-{reader.__name__}-{source}-{file_digest(filename)[:32]}"
+
+
+###############################################################################
+
+def is_array(value) -> bool:
+    """Checks if a value is a numpy array, without importing numpy.
+    """
+
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def dump(value, prefix: str, files: list) -> tuple:
+    """Describes how a parsed value is stored, writing its arrays to `.npy`
+    files.
+
+    Args:
+        value: parsed value.
+        prefix: path prefix of the files of the value.
+        files: list to which the names of the written files are added.
+
+    Returns:
+        : structure of the value, to be stored with marshal.
+
+    Raises:
+        ValueError: the value has an array that can't be stored.
+    """
+
+    if is_array(value):
+        if value.dtype.hasobject:
+            raise ValueError("arrays of objects are not cached")
+        filename = f"{prefix}.{len(files)}.npy"
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as arrayfile:
+            sys.modules["numpy"].save(arrayfile, value, allow_pickle=False)
+        os.replace(temporary, filename)
+        files.append(filename)
+        return ("npy", os.path.basename(filename))
+
+    if type(value) is tuple:
+        return ("tuple", [dump(item, prefix, files) for item in value])
+
+    if isinstance(value, tuple):
+        kind = type(value)
+        if not hasattr(kind, "_fields"):
+            raise ValueError("only tuples and named tuples are cached")
+        return ("namedtuple", [kind.__module__, kind.__qualname__,
+                               [dump(item, prefix, files) for item in value]])
+
+    return ("py", value)
+
+
+def restore(structure: tuple):
+    """Rebuilds a parsed value from its stored structure.
+
+    Args:
+        structure: structure of the value, as created by `dump`.
+
+    Returns:
+        : parsed value.
+    """
+
+    kind, content = structure
+    if kind == "npy":
+        import numpy as np
+
+        filename = os.path.join(CACHE_DIR, content)
+        return np.asarray(np.load(filename, mmap_mode="c", allow_pickle=False))
+    if kind == "tuple":
+        return tuple(restore(item) for item in content)
+    if kind == "namedtuple":
+        module, name, items = content
+        kind = ft.reduce(getattr, name.split("."),
+                         importlib.import_module(module))
+        return kind(*(restore(item) for item in items))
+    return content
+
+
+def store(key: str, value) -> bool:
+    """Stores a parsed value in the cache.
+
+    Args:
+        key: key of the parsed input.
+        value: parsed value.
+
+    Returns:
+        : true if the value was stored, false if it can't be stored.
+    """
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    prefix = os.path.join(CACHE_DIR, key)
+    files = []
+
+    try:
+        content = marshal.dumps(dump(value, prefix, files))
+    except ValueError:
+        for filename in files:
+            os.remove(filename)
+        return False
+
+    temporary = f"{prefix}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as manifest:
+        manifest.write(content)
+    os.replace(temporary, prefix + ".manifest")
+    prune()
+    return True
+
+
+def prune(limit: int=None):
+    """Removes the least recently used parsed inputs until the files of the
+    rest fit in a limit. An input is used when it is stored or loaded.
+
+    Args:
+        limit (optional): maximum size of the parsed inputs, in bytes.
+            Defaults to MAX_BYTES.
+    """
+
+    limit = MAX_BYTES if limit is None else limit
+    entries = {}
+    with os.scandir(CACHE_DIR) as scan:
+        for entry in scan:
+            if entry.name.endswith(".manifest"):
+                key = entry.name[:-len(".manifest")]
+            elif entry.name.endswith(".npy"):
+                key = entry.name.rsplit(".", 2)[0]
+            else:
+                continue
+            status = entry.stat()
+            used, size, files = entries.get(key, (0, 0, []))
+            if entry.name.endswith(".manifest"):
+                used = status.st_mtime_ns
+            entries[key] = (used, size + status.st_size, files + [entry.path])
+
+    total = sum(size for _, size, _ in entries.values())
+    for used, size, files in sorted(entries.values()):
+        if total <= limit:
+            break
+        for filename in files:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+        total -= size
+
+
+def load(key: str):
+    """Loads a parsed value from the cache.
+
+    Args:
+        key: key of the parsed input.
+
+    Returns:
+        : parsed value, or None if the key is not in the cache.
+    """
+
+    try:
+        filename = os.path.join(CACHE_DIR, key + ".manifest")
+        with open(filename, 'rb') as manifest:
+            structure = marshal.loads(manifest.read())
+        value = restore(structure)
+        os.utime(filename)
+        return value
+    except (OSError, EOFError, ValueError, ImportError, AttributeError):
+        return None
+
+
+def read_input(day: int, part: int, filename: str, backend: str=None):
+    """Reads an input file with the reader used by one part of a day, loading
+    the parsed value from the cache when the same input was already parsed.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        filename: name of the input file.
+        backend (optional): name of an alternative implementation of the part.
+            Defaults to the main implementation.
+
+    Returns:
+        : parsed input, as expected by the function that solves the part.
+    """
+
+    reader = getattr(days.load_day(day),
+                     days.get_spec(day, part, backend).reader)
+    key = cache_key(day, reader, filename)
+
+    value = load(key)
+    if value is None:
+        value = reader(filename)
+        store(key, value)
+    return value
@@ -0,0 +1,209 @@
+"""CPU and memory profiling of the functions that solve each part.
+
+    The CPU profile is written both as cProfile statistics (readable with
+`pstats` or snakeviz) and as collapsed stacks ("a;b;c <microseconds>" lines),
+the input format of flamegraph.pl, speedscope and inferno. Numba functions are
+opaque to both profilers: their time is counted in the python function that
+calls them.
+"""
+
+import collections as cls
+import copy
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+
+from aoc import benchmark
+
+
+###############################################################################
+
+def frame_name(frame) -> str:
+    """Names the function of a frame after its module and qualified name.
+    """
+
+    return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_qualname}"
+
+
+def builtin_name(function) -> str:
+    """Names a builtin function after its module and qualified name.
+    """
+
+    module = getattr(function, "__module__", None) or "builtins"
+    name = getattr(function, "__qualname__", None) or repr(function)
+    return f"{module}.{name}"
+
+
+def collapsed_stacks(function, *args) -> tuple:
+    """Runs a function while recording the time spent in each distinct call
+    stack, excluding the time spent in the functions it calls.
+
+    Args:
+        function: function to profile.
+        args: inputs of the function.
+
+    Returns:
+        result: result of the function.
+        totals (collections.Counter): self time, in nanoseconds, of each call
+            stack, with the names of the functions separated by ";".
+    """
+
+    stack = []
+    totals = cls.Counter()
+
+    def tracer(frame, event, arg):
+        now = time.perf_counter_ns()
+        if event == "call":
+            stack.append([frame_name(frame), now, 0])
+        elif event == "c_call":
+            stack.append([builtin_name(arg), now, 0])
+        elif stack and event in ("return", "c_return", "c_exception"):
+            name, start, children = stack.pop()
+            elapsed = now - start
+            path = ";".join([i[0] for i in stack] + [name])
+            totals[path] += elapsed - children
+            if stack:
+                stack[-1][2] += elapsed
+
+    sys.setprofile(tracer)
+    try:
+        result = function(*args)
+    finally:
+        sys.setprofile(None)
+
+    return result, totals
+
+
+def write_collapsed(totals: cls.Counter, filename: str):
+    """Writes call stacks in the collapsed format used by flamegraph tools.
+
+    Args:
+        totals: self time of each call stack, in nanoseconds.
+        filename: name of the file to write.
+    """
+
+    with open(filename, 'w', encoding='utf8') as stacksfile:
+        for path, elapsed in totals.most_common():
+            if elapsed >= 1000:
+                stacksfile.write(f"{path} {elapsed // 1000}\n")
+
+
+###############################################################################
+
+def profile_cpu(function, args: tuple, prefix: str, top: int=20) -> str:
+    """Profiles the CPU time of a function with cProfile and with the collapsed
+    stacks recorder. The function runs once for each profiler, with a fresh
+    copy of its inputs each time.
+
+    Args:
+        function: function to profile.
+        args: inputs of the function.
+        prefix: path prefix of the output files, `<prefix>.prof` (cProfile
+            statistics) and `<prefix>.collapsed` (collapsed stacks).
+        top (optional): number of functions listed in the report. Defaults to
+            20.
+
+    Returns:
+        : result of the function and the functions with the highest cumulative
+            time.
+    """
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *copy.deepcopy(args))
+    profiler.dump_stats(prefix + ".prof")
+
+    _, totals = collapsed_stacks(function, *copy.deepcopy(args))
+    write_collapsed(totals, prefix + ".collapsed")
+
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+    return (f"The solution is: {result}\n"
+            f"cProfile statistics written to {prefix}.prof\n"
+            f"Collapsed stacks written to {prefix}.collapsed\n"
+            + report.getvalue())
+
+
+def profile_memory(function, args: tuple, top: int=20,
+                    frames: int=10) -> str:
+    """Profiles the memory allocated by a function with tracemalloc.
+
+        Structures built by a function are usually freed when it returns, so a
+    snapshot taken at the end shows little. Instead, every time a python
+    function returns while the traced memory is at least 10% above the last
+    snapshot, a new snapshot is taken, and the report lists the allocation
+    sites of the last one, which is close to the peak.
+
+    Args:
+        function: function to profile.
+        args: inputs of the function.
+        top (optional): number of allocation sites listed in the report.
+            Defaults to 20.
+        frames (optional): depth of the tracebacks stored per allocation.
+            Defaults to 10.
+
+    Returns:
+        : result of the function, the peak of traced memory and the source
+            lines with the most memory allocated near the peak.
+    """
+
+    snapshot = [None, 64 * 1024]
+
+    def tracer(frame, event, arg):
+        if event == "return":
+            current, _ = tracemalloc.get_traced_memory()
+            if current > snapshot[1] * 1.1:
+                snapshot[:] = [tracemalloc.take_snapshot(), current]
+
+    tracemalloc.start(frames)
+    sys.setprofile(tracer)
+    try:
+        result = function(*args)
+    finally:
+        sys.setprofile(None)
+        current, peak = tracemalloc.get_traced_memory()
+        if snapshot[0] is None:
+            snapshot[:] = [tracemalloc.take_snapshot(), current]
+        tracemalloc.stop()
+
+    ignored = [tracemalloc.Filter(False, filename) for filename in
+               (tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>",
+                "<frozen importlib._bootstrap_external>")]
+    statistics = snapshot[0].filter_traces(ignored).statistics("lineno")
+
+    lines = [f"The solution is: {result}",
+             f"Peak traced memory: {peak / 1024**2:.3f} MiB",
+             f"Top {top} allocation sites near the peak "
+             f"({snapshot[1] / 1024**2:.3f} MiB traced):"]
+    for statistic in statistics[:top]:
+        frame = statistic.traceback[0]
+        lines.append(f"{statistic.size / 1024:>12.1f} KiB "
+                     f"{statistic.count:>10d} blocks  "
+                     f"{frame.filename}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+def profile(mode: str, function, args: tuple, prefix: str,
+            top: int=20) -> str:
+    """Profiles a function, compiling it first if it is a numba function, so
+    that the compilation is not part of the profile.
+
+    Args:
+        mode: "cpu" or "mem".
+        function: function to profile.
+        args: inputs of the function.
+        prefix: path prefix of the output files of the CPU profile.
+        top (optional): number of entries listed in the report. Defaults to 20.
+
+    Returns:
+        : report of the profile.
+    """
+
+    benchmark.compile_for(function, *args)
+    if mode == "cpu":
+        return profile_cpu(function, args, prefix, top)
+    return profile_memory(function, args, top)
@@ -0,0 +1,211 @@
+"""Tracking of benchmark results across commits.
+
+    Each run of the benchmark suite is appended to a history file of JSON lines,
+tagged with the git commit it ran on, and compared against a stored baseline,
+so that any timed function that got slower than a threshold is reported.
+"""
+
+import json
+import os
+import subprocess
+import time
+
+from aoc import benchmark
+from aoc import days
+
+
+###############################################################################
+
+BENCH_DIR = os.path.join(days.ROOT, ".aoc_bench")
+HISTORY_FILE = os.path.join(BENCH_DIR, "history.jsonl")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def git_commit() -> str:
+    """Finds the commit checked out in the repository.
+
+    Returns:
+        : hash of the commit, followed by "-dirty" if there are uncommitted
+            changes, or None if it can't be determined.
+    """
+
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=days.ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    try:
+        commit = git("rev-parse", "HEAD")
+        dirty = git("status", "--porcelain", "--untracked-files=no")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def benchmark_key(record: dict) -> str:
+    """Creates the name under which the result of a job is compared.
+
+    Args:
+        record: record of a job, as returned by `aoc.runner.run_job`.
+
+    Returns:
+        : name of the timed function and the part it solves (several parts
+            can share a function, with different arguments), followed by the
+            input it ran on.
+    """
+
+    name = record.get("function") or f"Day_{record['day']}"
+    return (f"{name}/part{record['part']}"
+            f"[{os.path.relpath(record['input'], days.ROOT)}]")
+
+
+def summarize_records(records: list) -> dict:
+    """Keeps the information of the records that is tracked over time.
+
+    Args:
+        records: records of the jobs of a benchmark run.
+
+    Returns:
+        : summary of each job, by benchmark key.
+    """
+
+    tracked = ("day", "part", "result", "error", "repeat", "warmup", "min_ns",
+               "median_ns", "p95_ns", "stddev_ns", "compile_ns", "parse_ns",
+               "peak_rss_kb")
+    return {benchmark_key(record): {key: record[key] for key in tracked
+                                    if key in record}
+            for record in records}
+
+
+###############################################################################
+
+def append_history(results: dict, filename: str=None) -> dict:
+    """Appends the results of a benchmark run to the history file.
+
+    Args:
+        results: summary of each job, by benchmark key.
+        filename (optional): history file. Defaults to HISTORY_FILE.
+
+    Returns:
+        entry: line added to the history, with the commit and the time of the
+            run.
+    """
+
+    filename = filename or HISTORY_FILE
+    entry = {"commit": git_commit(), "timestamp": time.time(),
+             "results": results}
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    with open(filename, 'a', encoding='utf8') as history:
+        history.write(json.dumps(benchmark.to_builtin(entry)) + "\n")
+    return entry
+
+
+def save_baseline(entry: dict, filename: str=None):
+    """Stores a benchmark run as the baseline of the next comparisons.
+
+    Args:
+        entry: benchmark run, as returned by `append_history`.
+        filename (optional): baseline file. Defaults to BASELINE_FILE.
+    """
+
+    filename = filename or BASELINE_FILE
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    with open(filename, 'w', encoding='utf8') as baseline:
+        json.dump(benchmark.to_builtin(entry), baseline, indent=1)
+
+
+def load_baseline(filename: str=None) -> dict:
+    """Loads the stored baseline.
+
+    Args:
+        filename (optional): baseline file. Defaults to BASELINE_FILE.
+
+    Returns:
+        : baseline benchmark run, or None if there is no baseline.
+    """
+
+    filename = filename or BASELINE_FILE
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r', encoding='utf8') as baseline:
+        return json.load(baseline)
+
+
+###############################################################################
+
+def compare(baseline: dict, current: dict, threshold: float,
+            min_delta_ns: float=0) -> list:
+    """Compares the median times of a benchmark run with the baseline.
+
+    Args:
+        baseline: summary of each job of the baseline, by benchmark key.
+        current: summary of each job of the current run, by benchmark key.
+        threshold: relative slowdown (0.1 is 10%) above which a function is
+            considered to have regressed.
+        min_delta_ns (optional): slowdowns smaller than this, in nanoseconds,
+            are ignored, since they are within the noise of fast functions.
+            Defaults to 0.
+
+    Returns:
+        : key, baseline median, current median, relative change and status of
+            each job. The status is one of "ok", "slower", "faster", "new",
+            "error" or "changed" (the answer differs from the baseline).
+    """
+
+    rows = []
+    for key, result in current.items():
+        old = baseline.get(key)
+        if "error" in result:
+            rows.append((key, None, None, None, "error"))
+            continue
+        if old is None or "median_ns" not in old:
+            rows.append((key, None, result["median_ns"], None, "new"))
+            continue
+
+        before, after = old["median_ns"], result["median_ns"]
+        change = after / before - 1 if before else 0.0
+        if old.get("result") != result.get("result"):
+            status = "changed"
+        elif change > threshold and after - before > min_delta_ns:
+            status = "slower"
+        elif change < -threshold and before - after > min_delta_ns:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((key, before, after, change, status))
+
+    return rows
+
+
+def format_comparison(rows: list) -> str:
+    """Formats the comparison of a benchmark run with the baseline as a table.
+
+    Args:
+        rows: rows returned by `compare`.
+
+    Returns:
+        : table with one line per job.
+    """
+
+    def ms(value) -> str:
+        return "-" if value is None else f"{value / 10**6:.3f}"
+
+    lines = [f"{'status':>8} {'baseline ms':>12} {'current ms':>12} "
+             f"{'change':>8}  function/part[input]"]
+    for key, before, after, change, status in rows:
+        percentage = "-" if change is None else f"{change:+.1%}"
+        lines.append(f"{status:>8} {ms(before):>12} {ms(after):>12} "
+                     f"{percentage:>8}  {key}")
+    return "\n".join(lines)
+
+
+def regressed(rows: list) -> bool:
+    """Checks if any job regressed, failed or changed its answer.
+
+    Args:
+        rows: rows returned by `compare`.
+
+    Returns:
+        : true if any job regressed, failed or changed its answer.
+    """
+
+    return any(row[-1] in ("slower", "error", "changed") for row in rows)
@@ -0,0 +1,207 @@
+"""Runs many day/part/input jobs at once on a pool of processes and gathers
+their answers, timings and memory usage in a single report.
+"""
+
+import concurrent.futures as cf
+import functools as ft
+import os
+import resource
+import time
+
+from aoc import benchmark
+from aoc import days
+
+
+###############################################################################
+
+def run_job(job: tuple, cache: bool=True) -> dict:
+    """Solves one part of a day on one input, measuring it with the benchmark
+    harness. Numba kernels are compiled (or loaded from the on-disk cache) by
+    the harness before the timed runs, in the process running the job.
+
+    Args:
+        job: day, part and name of the input file.
+        cache (optional): if true, the parsed input is loaded from the cache of
+            parsed inputs when possible. Defaults to True.
+
+    Returns:
+        record: measurement of the job, with the time spent importing the day's
+            module and parsing the input and the peak resident memory of the
+            process, in kilobytes. If the
+            job fails, the record has the error instead of the measurement.
+    """
+
+    day, part, filename = job
+    record = {"day": day, "part": part, "input": filename}
+
+    try:
+        start = time.perf_counter_ns()
+        days.load_day(day)
+        record["import_ns"] = time.perf_counter_ns() - start
+
+        start = time.perf_counter_ns()
+        data = days.read_input(day, part, filename, cache)
+        record["parse_ns"] = time.perf_counter_ns() - start
+
+        function, args = days.get_function(day, part, timed=False)
+        record.update(benchmark.measure(function, data, *args))
+    except Exception as error:
+        record["error"] = repr(error)
+
+    record["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return benchmark.to_builtin(record)
+
+
+def create_jobs(selected_days: list=None, parts: list=None,
+                test: bool=False) -> list:
+    """Creates the jobs that solve the shipped input of each day.
+
+    Args:
+        selected_days (optional): days to solve. Defaults to every day.
+        parts (optional): parts to solve. Defaults to both parts.
+        test (optional): if true, the jobs use the test inputs. Defaults to
+            False.
+
+    Returns:
+        : day, part and input file of each job.
+    """
+
+    return [(day, part, days.default_input(day, test))
+            for day in (selected_days or sorted(days.DAYS))
+            for part in (parts or sorted(days.DAYS[day]))]
+
+
+def run_all(jobs: list, workers: int=None, warmup: int=None,
+            repeat: int=None, cache: bool=True) -> list:
+    """Runs jobs concurrently, each one in a new worker process, so that the
+    peak memory of a process belongs to a single job.
+
+    Args:
+        jobs: day, part and input file of each job.
+        workers (optional): number of processes running jobs at the same time.
+            Defaults to the number of CPUs.
+        warmup (optional): untimed runs per job. Defaults to the configured
+            value.
+        repeat (optional): timed runs per job. Defaults to the configured
+            value.
+        cache (optional): if true, parsed inputs are loaded from the cache when
+            possible. Defaults to True.
+
+    Returns:
+        : records of the jobs, in the same order as the jobs.
+    """
+
+    settings = (benchmark.SETTINGS["warmup"] if warmup is None else warmup,
+                benchmark.SETTINGS["repeat"] if repeat is None else repeat)
+
+    with cf.ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                max_tasks_per_child=1,
+                                initializer=benchmark.configure,
+                                initargs=settings) as executor:
+        return list(executor.map(ft.partial(run_job, cache=cache), jobs))
+
+
+###############################################################################
+
+def format_report(records: list, elapsed_ns: int) -> str:
+    """Formats the records of the jobs as a table.
+
+    Args:
+        records: records of the jobs.
+        elapsed_ns: wall-clock time of the whole run in nanoseconds.
+
+    Returns:
+        : table with one line per job and a line with the total time.
+    """
+
+    def ms(value) -> str:
+        return "-" if value is None else f"{value / 10**6:.3f}"
+
+    lines = [f"{'day':>3} {'part':>4} {'answer':>16} {'parse ms':>10} "
+             f"{'compile ms':>10} {'median ms':>10} {'p95 ms':>10} "
+             f"{'peak MB':>8}  input"]
+
+    for record in records:
+        answer = record.get("error", record.get("result"))
+        lines.append(f"{record['day']:>3} {record['part']:>4} "
+                     f"{str(answer):>16} {ms(record.get('parse_ns')):>10} "
+                     f"{ms(record.get('compile_ns')):>10} "
+                     f"{ms(record.get('median_ns')):>10} "
+                     f"{ms(record.get('p95_ns')):>10} "
+                     f"{record['peak_rss_kb'] / 1024:>8.1f}  "
+                     f"{os.path.relpath(record['input'])}")
+
+    lines.append(f"total wall-clock time: {ms(elapsed_ns)} ms")
+    return "\n".join(lines)
+
+
+
+###############################################################################
+
+def compare_backends(day: int, part: int, filename: str, warmup: int=None,
+                     repeat: int=None, cache: bool=True) -> list:
+    """Measures every implementation of one part of a day on the same input,
+    one after the other in this process.
+
+    Args:
+        day: day of the problem.
+        part: part of the problem.
+        filename: name of the input file.
+        warmup (optional): untimed runs per backend. Defaults to the configured
+            value.
+        repeat (optional): timed runs per backend. Defaults to the configured
+            value.
+        cache (optional): if true, parsed inputs are loaded from the cache when
+            possible. Defaults to True.
+
+    Returns:
+        : records of the backends, the main implementation ("default") first.
+    """
+
+    records = []
+    for backend in [None, *sorted(days.DAYS[day][part].backends or ())]:
+        record = {"day": day, "part": part, "input": filename,
+                  "backend": backend or "default"}
+        try:
+            start = time.perf_counter_ns()
+            data = days.read_input(day, part, filename, cache, backend)
+            record["parse_ns"] = time.perf_counter_ns() - start
+
+            function, args = days.get_function(day, part, False, backend)
+            record.update(benchmark.measure(function, data, *args,
+                                            warmup=warmup, repeat=repeat))
+        except Exception as error:
+            record["error"] = repr(error)
+        records.append(benchmark.to_builtin(record))
+    return records
+
+
+def format_backends(records: list) -> str:
+    """Formats the records of the backends of a part as a table, with the
+    speedup of each one over the main implementation.
+
+    Args:
+        records: records returned by `compare_backends`.
+
+    Returns:
+        : table with one line per backend.
+    """
+
+    def ms(value) -> str:
+        return "-" if value is None else f"{value / 10**6:.3f}"
+
+    reference = records[0].get("median_ns")
+    lines = [f"{'backend':>10} {'answer':>20} {'parse ms':>10} "
+             f"{'compile ms':>10} {'median ms':>10} {'p95 ms':>10} "
+             f"{'speedup':>8}"]
+    for record in records:
+        answer = record.get("error", record.get("result"))
+        median = record.get("median_ns")
+        speedup = (f"{reference / median:.3g}x" if reference and median
+                   else "-")
+        lines.append(f"{record['backend']:>10} {str(answer):>20} "
+                     f"{ms(record.get('parse_ns')):>10} "
+                     f"{ms(record.get('compile_ns')):>10} "
+                     f"{ms(median):>10} {ms(record.get('p95_ns')):>10} "
+                     f"{speedup:>8}")
+    return "\n".join(lines)
\ No newline at end of file
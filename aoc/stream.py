@@ -0,0 +1,26 @@
+"""Lazy line readers for the days whose answers are folds over the lines of
+the input, so that inputs larger than the memory can be piped through them.
+"""
+
+import sys
+from typing import Iterator
+
+
+###############################################################################
+
+def read_lines(filename: str) -> Iterator[str]:
+    """Reads the non-empty lines of a file one at a time.
+
+    Args:
+        filename: name of the file to read, or "-" to read the standard input.
+
+    Returns:
+        : lines of the file, without surrounding whitespace.
+    """
+
+    if filename == "-":
+        yield from filter(None, (line.strip() for line in sys.stdin))
+        return
+
+    with open(filename, 'r', encoding='utf8') as datafile:
+        yield from filter(None, (line.strip() for line in datafile))